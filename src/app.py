@@ -7,7 +7,12 @@ from typing import Optional
 import os
 
 from src.pipeline import run_pipeline
-from src.report_generator import save_html_report, make_safe_filename
+from src.report_generator import save_html_report, report_path, REPORTS_DIR
+from src.profiling import profile_session, ProfilerBusy
+from src.segmenter import TranscriptUnavailable
+from src.checkpoint import JournalBusy
+from src.prediction_cache import get_prediction_cache
+from src.llm_client import get_llm_client
 
 
 # ---------------------------------------------------
@@ -38,6 +43,7 @@ app.add_middleware(
 class CheckRequest(BaseModel):
     url: str
     save_report: Optional[bool] = False  # default false
+    profile: Optional[bool] = False      # capture sampling + torch profiles for this run
 
 
 # ---------------------------------------------------
@@ -48,6 +54,19 @@ def health_check():
     return {"status": "ok", "message": "YouTube Fact Checker API is running!"}
 
 
+# ---------------------------------------------------
+# CACHE STATISTICS
+# ---------------------------------------------------
+@app.get("/stats")
+def stats():
+    # Classifier cache hit rate since startup + LLM circuit breaker states
+    return {
+        "status": "ok",
+        "classifier_cache": get_prediction_cache().stats(),
+        "llm_backends": get_llm_client().status()
+    }
+
+
 # ---------------------------------------------------
 # MAIN FACT CHECK ENDPOINT
 # ---------------------------------------------------
@@ -56,30 +75,42 @@ def check_video(req: CheckRequest):
     """
     Accepts a YouTube URL OR local transcript path.
     Runs full pipeline and optionally saves HTML report.
+    With profile=true, profiles are stored in reports/report_<id>.profile/.
+    Only one profiled run at a time, and one run per video: another one
+    gets 409.
     """
 
     video_input = req.url.strip()
     print(f"[API] Received input: {video_input}")
 
+    profile_summary = None
     try:
-        report = run_pipeline(video_input)
+        if req.profile:
+            with profile_session(report_path(video_input, "profile"), wait=False) as session:
+                report = run_pipeline(video_input)
+            profile_summary = session.summary
+        else:
+            report = run_pipeline(video_input)
+    except (ProfilerBusy, JournalBusy) as e:
+        raise HTTPException(status_code=409, detail=f"{e}, retry later")
+    except TranscriptUnavailable as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Pipeline failed: {e}")
 
     saved_report_path = None
     if req.save_report:
         try:
-            os.makedirs("reports", exist_ok=True)
-            safe_name = make_safe_filename(video_input)
-            out_path = f"reports/report_{safe_name}.html"
-            saved_report_path = save_html_report(report, out_path)
+            os.makedirs(REPORTS_DIR, exist_ok=True)
+            saved_report_path = save_html_report(report, report_path(video_input, "html"))
         except Exception as e:
             saved_report_path = f"Failed to save HTML report: {e}"
 
     return {
         "status": "ok",
         "report": report,
-        "saved_report": saved_report_path
+        "saved_report": saved_report_path,
+        "profile": profile_summary
     }
 
 
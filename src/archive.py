@@ -0,0 +1,85 @@
+# src/archive.py
+
+import os
+import json
+import glob
+import hashlib
+
+from src.report_generator import make_safe_filename
+
+ARCHIVE_DIR = os.path.join("reports", "archive")
+
+
+# ---------------------------------------------------
+# Stage input versions
+# ---------------------------------------------------
+def transcript_hash(sentences) -> str:
+    h = hashlib.sha256("\n".join(sentences).encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+def build_stage_versions(sentences, classifier_version: str,
+                         prefilter_version: str, verifier_version: str) -> dict:
+    """
+    Records, per report stage, the versions of everything that stage read.
+    A stage is stale when any of its recorded inputs differ from the
+    current ones (see src/refresh.py).
+    """
+    t_hash = transcript_hash(sentences)
+
+    return {
+        "transcript": {
+            "transcript_hash": t_hash,
+        },
+        "triage": {
+            "transcript_hash": t_hash,
+            "classifier_version": classifier_version,
+            "prefilter_version": prefilter_version,
+        },
+        "verification": {
+            "verifier_version": verifier_version,
+        },
+    }
+
+
+# ---------------------------------------------------
+# Stored report records
+# ---------------------------------------------------
+def record_path(video_id: str, archive_dir: str = ARCHIVE_DIR) -> str:
+    return os.path.join(archive_dir, f"{make_safe_filename(video_id)}.json")
+
+
+def save_report_record(report: dict, sentences, archive_dir: str = ARCHIVE_DIR) -> str:
+    """
+    Stores the report together with its transcript sentences so later
+    stages can be recomputed without fetching the captions again.
+    Written to a temp file and renamed, so a crash never leaves a
+    half-written record behind. An existing record with a transcript is
+    never replaced by one without.
+    """
+    os.makedirs(archive_dir, exist_ok=True)
+    path = record_path(report["video_id"], archive_dir)
+
+    # Captions are never fetched again, so an empty transcript must not
+    # replace a stored one
+    if not sentences and os.path.exists(path) and load_report_record(path).get("sentences"):
+        print(f"[archive] Keeping {path}: new transcript is empty")
+        return path
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"report": report, "sentences": sentences}, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+    return path
+
+
+def load_report_record(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def iter_archive(archive_dir: str = ARCHIVE_DIR):
+    """Yields (path, record) for every stored report."""
+    for path in sorted(glob.glob(os.path.join(archive_dir, "*.json"))):
+        yield path, load_report_record(path)
@@ -0,0 +1,103 @@
+# src/benchmark_ingest.py
+#
+# Compares the previous JSON3 loader (json.load + nested loops) with
+# caption_ingest on synthetic YouTube auto-caption files. Only caption
+# text extraction is timed; sentence splitting is the same for both.
+#
+#   cd src && python benchmark_ingest.py              # 500 files
+#   cd src && python benchmark_ingest.py 2000 4       # 2000 files, 4 workers
+
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+
+from caption_ingest import read_caption_text, ingest_captions
+
+WORDS = ("the vaccine was tested on over forty thousand people in 2020 and "
+         "scientists say café \"quotes\" über résumé it is not true that").split()
+
+
+# ------------------------------
+# Synthetic captions
+# ------------------------------
+def make_json3(n_events: int, seed: int) -> dict:
+    """Roughly the shape yt-dlp writes for a ~10 minute auto-captioned video."""
+    rng = random.Random(seed)
+    events = [{"tStartMs": 0, "dDurationMs": 0, "id": 1, "wpWinPosId": 1, "wsWinStyleId": 1}]
+
+    t = 0
+    for _ in range(n_events):
+        segs = [{"utf8": rng.choice(WORDS)}]
+        segs += [
+            {"utf8": " " + rng.choice(WORDS), "tOffsetMs": 160 * k, "acAsrConf": 0}
+            for k in range(1, rng.randint(3, 8))
+        ]
+        events.append({"tStartMs": t, "dDurationMs": 3000, "wWinId": 1, "segs": segs})
+        events.append({"tStartMs": t + 2900, "wWinId": 1, "aAppend": 1, "segs": [{"utf8": "\n"}]})
+        t += 3000
+
+    return {"wireMagic": "pb3", "pens": [{}], "wsWinStyles": [{}], "wpWinPositions": [{}],
+            "events": events}
+
+
+# ------------------------------
+# Previous loader (for comparison only)
+# ------------------------------
+def legacy_json3_text(path: str) -> str:
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    lines = []
+    for event in data.get("events", []):
+        if "segs" in event:
+            for seg in event["segs"]:
+                t = seg.get("utf8", "").strip().replace("\n", " ")
+                lines.append(t)
+
+    return " ".join(lines)
+
+
+def measure(name, fn, paths, total_bytes):
+    start = time.perf_counter()
+    fn(paths)
+    elapsed = time.perf_counter() - start
+
+    print(f"{name:<30} {len(paths) / elapsed:9.1f} files/s  "
+          f"{total_bytes / elapsed / 1024 / 1024:8.1f} MB/s  ({elapsed:.2f} s)")
+
+
+def main(n_files: int = 500, workers: int = None):
+    workers = workers or os.cpu_count() or 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(n_files):
+            path = os.path.join(tmp, f"video{i:05d}.en.json3")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(make_json3(200, i), f, ensure_ascii=i % 2 == 0)
+            paths.append(path)
+
+        total_bytes = sum(os.path.getsize(p) for p in paths)
+        print(f"=== CAPTION INGEST BENCHMARK ({n_files} JSON3 files, "
+              f"{total_bytes / 1024 / 1024:.1f} MB) ===\n")
+
+        # Same text from both parsers
+        for path in paths[:20]:
+            assert read_caption_text(path) == legacy_json3_text(path), path
+
+        measure("json.load + loops (previous)", lambda ps: [legacy_json3_text(p) for p in ps],
+                paths, total_bytes)
+        measure("caption_ingest, 1 process", lambda ps: list(ingest_captions(ps, 1, segment=False)),
+                paths, total_bytes)
+        if workers > 1:
+            measure(f"caption_ingest, {workers} processes",
+                    lambda ps: list(ingest_captions(ps, workers, segment=False)),
+                    paths, total_bytes)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500,
+         int(sys.argv[2]) if len(sys.argv) > 2 else None)
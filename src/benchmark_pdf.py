@@ -0,0 +1,116 @@
+# src/benchmark_pdf.py
+#
+# Compares native PDF export with the old HTML -> wkhtmltopdf path.
+# The HTML path is only measured when pdfkit and wkhtmltopdf are installed.
+#
+#   cd src && python benchmark_pdf.py            # 10,000 claims
+#   cd src && python benchmark_pdf.py 50000
+
+import os
+import sys
+import time
+import tempfile
+import tracemalloc
+
+from benchmark_report import make_report
+from report_generator import write_html_report
+from pdf_report import write_pdf_report
+
+try:
+    import resource   # Unix only: peak RSS of child processes (wkhtmltopdf)
+except ImportError:
+    resource = None
+
+
+# Non-Latin claims: must come out as text, not '?' (needs a TrueType font)
+NON_LATIN_CLAIMS = [
+    "Луна находится примерно в 384 000 километров от Земли.",
+    "Η Σελήνη απέχει περίπου 384.000 χιλιόμετρα από τη Γη.",
+]
+
+
+def add_non_latin_claims(report):
+    for i, sentence in enumerate(NON_LATIN_CLAIMS):
+        report["factual_claims_verified"][i]["sentence"] = sentence
+    return report
+
+
+def check_non_latin_text(path):
+    """Extracts the page text if pypdf is installed; None otherwise."""
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        return None
+
+    text = "".join(page.extract_text() for page in PdfReader(path).pages[:2])
+    return all(sentence in text for sentence in NON_LATIN_CLAIMS)
+
+
+def native_pdf(report, path):
+    with open(path, "wb") as f:
+        write_pdf_report(report, f)
+
+
+def html_to_pdf(report, path):
+    """Previous save_pdf_report: temp HTML file + wkhtmltopdf via pdfkit."""
+    import pdfkit
+
+    tmp_html = path + ".tmp.html"
+    with open(tmp_html, "w", encoding="utf-8") as f:
+        write_html_report(report, f)
+
+    pdfkit.from_file(tmp_html, path)
+    os.remove(tmp_html)
+
+
+def html_path_available():
+    try:
+        import pdfkit
+        pdfkit.configuration()
+        return True
+    except Exception:
+        return False
+
+
+def measure(fn, report, path):
+    start = time.perf_counter()
+    fn(report, path)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    fn(report, path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed, peak, os.path.getsize(path)
+
+
+def main(n_claims: int = 10_000):
+    report = add_non_latin_claims(make_report(n_claims))
+    print(f"=== PDF REPORT BENCHMARK ({n_claims} claims) ===\n")
+
+    candidates = [("native (in-process)", native_pdf)]
+    if html_path_available():
+        candidates.append(("HTML -> wkhtmltopdf", html_to_pdf))
+    else:
+        print("HTML -> wkhtmltopdf path unavailable (pdfkit / wkhtmltopdf not installed)\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, fn in candidates:
+            elapsed, peak, size = measure(fn, report, os.path.join(tmp, "report.pdf"))
+            print(f"{name:<22} time={elapsed:7.2f} s  "
+                  f"python peak={peak / 1024 / 1024:7.2f} MiB  output={size / 1024 / 1024:6.2f} MiB")
+
+        native_path = os.path.join(tmp, "native.pdf")
+        native_pdf(report, native_path)
+        intact = check_non_latin_text(native_path)
+        if intact is not None:
+            print(f"\nnon-Latin claims extracted intact: {'yes' if intact else 'NO'}")
+
+    if resource is not None and len(candidates) > 1:
+        child_kib = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        print(f"\nwkhtmltopdf peak RSS: {child_kib / 1024:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
@@ -0,0 +1,150 @@
+# src/benchmark_report.py
+#
+# Compares the old string-concatenation HTML renderer with the streaming
+# HtmlReportWriter on a synthetic report.
+#
+#   cd src && python benchmark_report.py            # 10,000 claims
+#   cd src && python benchmark_report.py 50000
+
+import os
+import sys
+import time
+import tempfile
+import tracemalloc
+
+from report_generator import write_html_report
+
+VERDICTS = ["TRUE", "FALSE", "PARTIALLY TRUE", "UNVERIFIABLE"]
+
+
+# ------------------------------
+# Synthetic report
+# ------------------------------
+def make_report(n_claims: int):
+    def claim(i):
+        return {
+            "sentence": f"Claim number {i} says the <Earth> is {i % 7} times \"bigger\" & older.",
+            "model_score": 0.5 + (i % 50) / 100,
+            "fact_check": {
+                "verdict": VERDICTS[i % 4],
+                "explanation": "Short reasoning about the claim. " * 4,
+                "evidence": [
+                    {"source": "Wikipedia", "description": f"Evidence item {i}."},
+                    {"source": "NASA", "description": "Second source."},
+                ],
+            },
+        }
+
+    half = n_claims // 2
+    return {
+        "video_id": "benchmark",
+        "total_sentences": n_claims * 3,
+        "counts": {
+            "factual_claims": half,
+            "disputed_claims": n_claims - half,
+            "ignored": n_claims * 2,
+            "prefiltered": n_claims,
+        },
+        "factual_claims_verified": [claim(i) for i in range(half)],
+        "disputed_claims_verified": [claim(i) for i in range(half, n_claims)],
+    }
+
+
+# ------------------------------
+# Previous renderer (for comparison only)
+# ------------------------------
+def legacy_render_html_report(report):
+    video_id = report.get("video_id", "unknown")
+    total = report.get("total_sentences", 0)
+    counts = report.get("counts", {})
+
+    html = f"""
+    <html><head><meta charset="utf-8"/><title>Fact Check Report - {video_id}</title></head>
+    <body>
+      <h1>Fact Check Report — {video_id}</h1>
+      <div class="summary card">
+        <p><strong>Total sentences:</strong> {total}</p>
+        <p><strong>Factual claims:</strong> {counts.get('factual_claims', 0)}</p>
+        <p><strong>Disputed claims:</strong> {counts.get('disputed_claims', 0)}</p>
+        <p><strong>Ignored:</strong> {counts.get('ignored', 0)}</p>
+      </div>
+    """
+
+    for key, title in (("factual_claims_verified", "Factual claims (verified)"),
+                       ("disputed_claims_verified", "Disputed claims (verified)")):
+        html += f"<h2>{title}</h2>\n"
+        for item in report.get(key, []):
+            fc = item.get("fact_check", {})
+            verdict = fc.get("verdict", "UNVERIFIABLE")
+
+            css = "unv"
+            if verdict == "TRUE": css = "true"
+            elif verdict == "FALSE": css = "false"
+            elif "PARTIAL" in verdict: css = "partial"
+
+            evidence_html = "".join(
+                f"<li><strong>{ev.get('source')}</strong>: {ev.get('description')}</li>"
+                for ev in fc.get("evidence", [])
+            )
+
+            html += f"""
+            <div class="card {css}">
+              <p><strong>Sentence:</strong> <em>{item.get('sentence')}</em></p>
+              <p><strong>Model score:</strong> {item.get('model_score')}</p>
+              <p><strong>Verdict:</strong> {verdict}</p>
+              <p><strong>Explanation:</strong> {fc.get('explanation')}</p>
+              <p><strong>Evidence:</strong></p>
+              <ul>{evidence_html}</ul>
+            </div>
+            """
+
+    html += "</body></html>"
+    return html
+
+
+def legacy_save(report, path):
+    html = legacy_render_html_report(report)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(html)
+
+
+def streaming_save(report, path):
+    with open(path, "w", encoding="utf-8") as f:
+        write_html_report(report, f)
+
+
+# ------------------------------
+# Measurement
+# ------------------------------
+def measure(fn, report, path, repeats: int = 3):
+    # Timing and memory are measured in separate runs: tracemalloc slows
+    # down allocation-heavy code and would distort the comparison.
+    elapsed = min(_timed(fn, report, path) for _ in range(repeats))
+
+    tracemalloc.start()
+    fn(report, path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed, peak, os.path.getsize(path)
+
+
+def _timed(fn, report, path):
+    start = time.perf_counter()
+    fn(report, path)
+    return time.perf_counter() - start
+
+
+def main(n_claims: int = 10_000):
+    report = make_report(n_claims)
+    print(f"=== HTML REPORT BENCHMARK ({n_claims} claims) ===\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, fn in (("legacy (string +=)", legacy_save), ("streaming writer", streaming_save)):
+            elapsed, peak, size = measure(fn, report, os.path.join(tmp, "report.html"))
+            print(f"{name:<20} time={elapsed * 1000:8.1f} ms  "
+                  f"peak={peak / 1024 / 1024:7.2f} MiB  output={size / 1024 / 1024:6.2f} MiB")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
@@ -0,0 +1,202 @@
+# src/caption_ingest.py
+#
+# Caption file → plain text (→ sentences), for single files and for bulk
+# ingest of many files in a process pool.
+#
+# Supported inputs:
+#   .json3        YouTube timed-text (yt-dlp --sub-format json3)
+#   .vtt          WebVTT (incl. YouTube's rolling auto-captions)
+#   .srt          SubRip
+#   anything else plain text
+#
+# JSON3 files are not decoded into a Python object tree. Only the caption
+# strings ("utf8" values of segs) are needed: the memory-mapped file is
+# scanned for them in document order, and all of them are then decoded
+# by one C-level json.loads call on a JSON array built from the matches.
+#
+#   python -m src.caption_ingest FILE_OR_DIR [...] [--workers N]
+
+import os
+import re
+import html
+import json
+import mmap
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from src.languages import detect_language, language_from_caption_path, get_segmenter
+except ImportError:
+    from languages import detect_language, language_from_caption_path, get_segmenter
+
+CAPTION_EXTENSIONS = (".json3", ".vtt", ".srt")
+
+# Files per task sent to a worker process
+POOL_CHUNKSIZE = 8
+
+# "utf8": "<JSON string>"; an escaped quote can never start a match.
+# JSON writers never put whitespace before the colon.
+JSON3_SEG_RE = re.compile(rb'"utf8":\s*"([^"\\]*(?:\\.[^"\\]*)*)"', re.DOTALL)
+
+CUE_TAG_RE = re.compile(r"<[^>]*>|\{\\[^}]*\}")     # <c>, <i>, <00:00:01.000>, {\an8}
+BLANK_LINE_RE = re.compile(r"\r?\n\s*\r?\n")
+
+
+# ---------------------------------------------------
+# Language + sentence splitting
+# ---------------------------------------------------
+def split_sentences(text: str, lang: str):
+    nlp = get_segmenter(lang)
+    doc = nlp(text)
+    return [sent.text.strip() for sent in doc.sents]
+
+
+def caption_language(path: str, text: str):
+    """File name tag from yt-dlp if present, otherwise detected from the text."""
+    return language_from_caption_path(path) or detect_language(text)
+
+
+# ---------------------------------------------------
+# JSON3
+# ---------------------------------------------------
+def json3_text(path: str) -> str:
+    """
+    Joins the text of every caption segment. Files that are not JSON3 at
+    all (no "events", or broken string escapes) are returned as plain text.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return ""
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            raw_segs = JSON3_SEG_RE.findall(buf)
+            if not raw_segs and buf.find(b'"events"') == -1:
+                return buf[:].decode("utf-8", errors="ignore")
+
+            try:
+                segs = json.loads(b'["' + b'","'.join(raw_segs) + b'"]')
+            except ValueError:
+                return buf[:].decode("utf-8", errors="ignore")
+
+    # Stripping each segment first keeps "\n" segments as empty entries
+    return " ".join([t.strip() for t in segs]).replace("\n", " ")
+
+
+# ---------------------------------------------------
+# WebVTT / SRT
+# ---------------------------------------------------
+def cue_text(data: str) -> str:
+    """
+    Text of every cue in a WebVTT or SRT file. Header, NOTE and STYLE
+    blocks have no "-->" timing line and are skipped. Lines repeated by
+    rolling auto-captions are kept once.
+    """
+    lines = []
+    previous = None
+
+    for block in BLANK_LINE_RE.split(data):
+        block_lines = block.strip("\r\n").splitlines()
+
+        timing = next((i for i, line in enumerate(block_lines) if "-->" in line), None)
+        if timing is None:
+            continue
+
+        for line in block_lines[timing + 1:]:
+            t = html.unescape(CUE_TAG_RE.sub("", line)).strip()
+            if t and t != previous:
+                lines.append(t)
+                previous = t
+
+    return " ".join(lines)
+
+
+# ---------------------------------------------------
+# Any caption file
+# ---------------------------------------------------
+def read_caption_text(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+
+    if ext == ".json3":
+        return json3_text(path)
+
+    with open(path, "r", encoding="utf-8-sig", errors="ignore") as f:
+        data = f.read()
+
+    if ext in (".vtt", ".srt"):
+        return cue_text(data)
+
+    return data
+
+
+def load_caption_file(path: str, segment: bool = True):
+    """
+    Returns (language, sentences), or (language, text) with segment=False.
+    """
+    text = read_caption_text(path)
+    lang = caption_language(path, text)
+
+    if not segment:
+        return lang, text
+
+    return lang, split_sentences(text, lang)
+
+
+# ---------------------------------------------------
+# Bulk ingest
+# ---------------------------------------------------
+def _load_for_pool(args):
+    path, segment = args
+    try:
+        return (path,) + load_caption_file(path, segment)
+    except Exception as e:
+        print(f"[caption_ingest] {path}: {e}")
+        return path, None, [] if segment else ""
+
+
+def find_caption_files(paths):
+    """Expands directories into the caption files they contain."""
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                found.extend(
+                    os.path.join(root, name) for name in sorted(names)
+                    if name.lower().endswith(CAPTION_EXTENSIONS)
+                )
+        else:
+            found.append(path)
+    return found
+
+
+def ingest_captions(paths, workers: int = None, segment: bool = True):
+    """
+    Parses many caption files, in input order. Yields
+    (path, language, sentences) — or (path, language, text) with
+    segment=False. Unreadable files yield language None.
+
+    workers=1 parses in this process; otherwise a process pool of
+    `workers` (default: CPU count) is used.
+    """
+    tasks = [(path, segment) for path in paths]
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(tasks) <= 1:
+        yield from map(_load_for_pool, tasks)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(_load_for_pool, tasks, chunksize=POOL_CHUNKSIZE)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Parse caption files into sentences.")
+    parser.add_argument("paths", nargs="+", help="caption files or folders")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size")
+    parser.add_argument("--text-only", action="store_true", help="skip sentence splitting")
+    args = parser.parse_args()
+
+    files = find_caption_files(args.paths)
+    for path, lang, result in ingest_captions(files, args.workers, segment=not args.text_only):
+        size = f"{len(result)} chars" if args.text_only else f"{len(result)} sentences"
+        print(f"{path}: language={lang} {size}")
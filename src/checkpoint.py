@@ -0,0 +1,167 @@
+# src/checkpoint.py
+
+import os
+import json
+import threading
+
+from src.report_generator import make_safe_filename
+
+CHECKPOINT_DIR = "checkpoints"
+
+# Journal path → lock, held by one RunJournal from __init__ to close()
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+class JournalBusy(RuntimeError):
+    """Another run of the same video holds its journal."""
+
+
+# ---------------------------------------------------
+# Append-only journal for one pipeline run
+# ---------------------------------------------------
+class RunJournal:
+    """
+    Append-only JSONL journal of a single pipeline run.
+
+    Every completed stage (transcript, triage, each verdict) is written as
+    one line and fsync'ed immediately, so a crash loses at most the claim
+    that was being checked when it happened.
+
+    Record types:
+      {"type": "transcript", "sentences": [...], "language": "en"}
+      {"type": "triage", "result": {...}, "classifier_version": "..."}
+      {"type": "verdict", "section": "factual"|"disputed", "index": i, "fact_check": {...},
+       "latency_ms": ...}
+
+    Only one RunJournal per video can be open in a process at a time;
+    opening a second one raises JournalBusy.
+    """
+
+    def __init__(self, video_id: str, checkpoint_dir: str = CHECKPOINT_DIR):
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        self.path = os.path.join(
+            checkpoint_dir, f"{make_safe_filename(video_id)}.journal.jsonl"
+        )
+
+        with _locks_guard:
+            self._lock = _locks.setdefault(os.path.abspath(self.path), threading.Lock())
+        if not self._lock.acquire(blocking=False):
+            raise JournalBusy(f"{video_id} is already being checked")
+        self._released = False
+
+        self.sentences = None
+        self.language = None
+        self.triage = None
+        self.classifier_version = None
+        self.verdicts = {"factual": {}, "disputed": {}}
+        self.latencies = {"factual": {}, "disputed": {}}
+
+        try:
+            self._load()
+            # Binary mode: byte offsets stay exact, and no CRLF translation on Windows
+            self._fh = open(self.path, "ab")
+        except BaseException:
+            self._release()
+            raise
+
+    # -----------------------------
+    # Replay existing journal
+    # -----------------------------
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, "rb") as f:
+            lines = f.readlines()
+
+        valid_bytes = 0
+        for line in lines:
+            if not line.endswith(b"\n"):
+                break
+
+            try:
+                record = json.loads(line.decode("utf-8"))
+            except ValueError:
+                # Torn write from a crash (incl. a cut multi-byte character):
+                # drop it and everything after it
+                break
+
+            valid_bytes += len(line)
+            kind = record.get("type")
+
+            if kind == "transcript":
+                self.sentences = record["sentences"]
+                self.language = record.get("language")
+            elif kind == "triage":
+                self.triage = record["result"]
+                self.classifier_version = record.get("classifier_version")
+            elif kind == "verdict":
+                self.verdicts[record["section"]][record["index"]] = record["fact_check"]
+                self.latencies[record["section"]][record["index"]] = record.get("latency_ms")
+
+        # Cut off a partially written tail so new records start on a clean line
+        if valid_bytes != os.path.getsize(self.path):
+            with open(self.path, "r+b") as f:
+                f.truncate(valid_bytes)
+
+    def _append(self, record: dict):
+        self._fh.write((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+
+    # -----------------------------
+    # Stage writers
+    # -----------------------------
+    def record_transcript(self, sentences, language: str = None):
+        self.sentences = sentences
+        self.language = language
+        self._append({"type": "transcript", "sentences": sentences, "language": language})
+
+    def record_triage(self, result, classifier_version: str = None):
+        self.triage = result
+        self.classifier_version = classifier_version
+        self._append({
+            "type": "triage",
+            "result": result,
+            "classifier_version": classifier_version
+        })
+
+    def record_verdict(self, section: str, index: int, fact_check: dict, latency_ms: float = None):
+        self.verdicts[section][index] = fact_check
+        self.latencies[section][index] = latency_ms
+        self._append({
+            "type": "verdict",
+            "section": section,
+            "index": index,
+            "fact_check": fact_check,
+            "latency_ms": latency_ms
+        })
+
+    def get_verdict(self, section: str, index: int):
+        return self.verdicts[section].get(index)
+
+    def get_latency(self, section: str, index: int):
+        return self.latencies[section].get(index)
+
+    # -----------------------------
+    # Lifecycle
+    # -----------------------------
+    def _release(self):
+        if not self._released:
+            self._released = True
+            self._lock.release()
+
+    def close(self):
+        if not self._fh.closed:
+            self._fh.close()
+        self._release()
+
+    def discard(self):
+        """Removes the journal once the run has finished successfully."""
+        if not self._fh.closed:
+            self._fh.close()
+        # Still locked: no other run can open the file before it is gone
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self._release()
@@ -0,0 +1,408 @@
+# src/claim_store.py
+#
+# Columnar (Parquet) archive of every checked claim across all videos,
+# plus a vectorised query API on top of it.
+#
+#   python -m src.claim_store                  # print summary queries
+#   python -m src.claim_store --import-json    # backfill from reports/archive/*.json
+#   python -m src.claim_store --compact        # merge small part files
+#
+# Each pipeline run (and each refresh) appends one Parquet file, one row
+# per checked claim, tagged with a run_id. A run without claims writes one
+# marker row (claim columns null) so it still becomes the video's latest
+# run. Reruns of a video do not replace older rows; queries only count the
+# latest run of every video unless `latest_only=False`. Queries scan the whole folder as one
+# pyarrow dataset, reading only the columns they need. Many small part
+# files make every scan slow, so `compact_store` merges them.
+
+import os
+import re
+import uuid
+import hashlib
+import argparse
+from datetime import datetime, timezone
+
+CLAIM_STORE_DIR = os.path.join("reports", "claims")
+
+# compact_store writes files of at most this many rows
+COMPACT_ROWS_PER_FILE = 1_000_000
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.dataset
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError("pyarrow is not installed. Run: pip install pyarrow")
+    return pyarrow
+
+
+# ---------------------------------------------------
+# Claim identity
+# ---------------------------------------------------
+def normalize_sentence(sentence: str) -> str:
+    """
+    Lower-cases and strips punctuation/extra whitespace, so the same claim
+    repeated with different caption formatting gets the same key.
+    """
+    return re.sub(r"[\W_]+", " ", sentence.lower()).strip()
+
+
+def sentence_key(sentence: str) -> str:
+    return hashlib.sha1(normalize_sentence(sentence).encode("utf-8")).hexdigest()[:16]
+
+
+# ---------------------------------------------------
+# Schema
+# ---------------------------------------------------
+def claim_schema():
+    pa = _require_pyarrow()
+    return pa.schema([
+        ("run_id", pa.string()),        # one per append; sorts by time
+        ("video_id", pa.string()),
+        ("channel", pa.string()),
+        ("checked_at", pa.timestamp("ms", tz="UTC")),
+        ("section", pa.dictionary(pa.int8(), pa.string())),
+        ("claim_key", pa.string()),
+        ("sentence", pa.string()),
+        ("model_score", pa.float32()),
+        ("verdict", pa.dictionary(pa.int8(), pa.string())),
+        ("explanation", pa.string()),
+        ("n_evidence", pa.int16()),
+        ("latency_ms", pa.float32()),
+        ("classifier_version", pa.string()),
+        ("verifier_version", pa.string()),
+        ("llm_model", pa.string()),     # model that produced the verdict (null if unchecked)
+    ])
+
+
+def new_run_id(checked_at: datetime = None) -> str:
+    checked_at = checked_at or datetime.now(timezone.utc)
+    return f"{checked_at.strftime('%Y%m%dT%H%M%S%f')}-{uuid.uuid4().hex[:8]}"
+
+
+def report_to_rows(report: dict, channel: str = None, checked_at: datetime = None,
+                   run_id: str = None) -> dict:
+    """
+    Flattens a report into column lists, one entry per checked claim, or a
+    single marker entry with null claim columns if there are none.
+    """
+    checked_at = checked_at or datetime.now(timezone.utc)
+    run_id = run_id or new_run_id(checked_at)
+    versions = report.get("stage_versions", {})
+    classifier_version = versions.get("triage", {}).get("classifier_version")
+    verifier_version = versions.get("verification", {}).get("verifier_version")
+
+    columns = {name: [] for name in claim_schema().names}
+
+    sections = (
+        ("factual", report.get("factual_claims_verified", [])),
+        ("disputed", report.get("disputed_claims_verified", [])),
+    )
+    for section, items in sections:
+        for item in items:
+            fc = item.get("fact_check") or {}
+            sentence = str(item.get("sentence", ""))
+
+            columns["run_id"].append(run_id)
+            columns["video_id"].append(report.get("video_id"))
+            columns["channel"].append(channel)
+            columns["checked_at"].append(checked_at)
+            columns["section"].append(section)
+            columns["claim_key"].append(sentence_key(sentence))
+            columns["sentence"].append(sentence)
+            columns["model_score"].append(item.get("model_score"))
+            columns["verdict"].append(str(fc.get("verdict", "UNVERIFIABLE")).upper())
+            columns["explanation"].append(str(fc.get("explanation", "")))
+            columns["n_evidence"].append(len(fc.get("evidence", []) or []))
+            columns["latency_ms"].append(item.get("latency_ms"))
+            columns["classifier_version"].append(classifier_version)
+            columns["verifier_version"].append(verifier_version)
+            columns["llm_model"].append(fc.get("model"))
+
+    if not columns["run_id"]:
+        marker = {
+            "run_id": run_id,
+            "video_id": report.get("video_id"),
+            "channel": channel,
+            "checked_at": checked_at,
+            "classifier_version": classifier_version,
+            "verifier_version": verifier_version,
+        }
+        for name, values in columns.items():
+            values.append(marker.get(name))
+
+    return columns
+
+
+# ---------------------------------------------------
+# Append-only writes
+# ---------------------------------------------------
+def append_report(report: dict, channel: str = None, store_dir: str = CLAIM_STORE_DIR,
+                  checked_at: datetime = None):
+    """
+    Writes one new Parquet file holding every claim of `report` (or its
+    marker row if it has none). Returns the file path.
+    """
+    pa = _require_pyarrow()
+
+    run_id = new_run_id(checked_at)
+    columns = report_to_rows(report, channel, checked_at, run_id)
+    table = pa.Table.from_pydict(columns, schema=claim_schema())
+    return _write_part(table, store_dir, f"part-{run_id}.parquet")
+
+
+def _write_part(table, store_dir: str, name: str) -> str:
+    pa = _require_pyarrow()
+
+    os.makedirs(store_dir, exist_ok=True)
+    path = os.path.join(store_dir, name)
+
+    # Write under a temp name so readers never see a half-written file
+    tmp_path = path + ".tmp"
+    pa.parquet.write_table(table, tmp_path, compression="zstd")
+    os.replace(tmp_path, path)
+
+    return path
+
+
+def stored_video_ids(store_dir: str = CLAIM_STORE_DIR) -> set:
+    if not os.path.isdir(store_dir):
+        return set()
+    # Marker rows included: a video whose run had no claims is stored too
+    return set(open_store(store_dir).to_table(columns=["video_id"])["video_id"].to_pylist())
+
+
+def import_json_archive(archive_dir: str = None, store_dir: str = CLAIM_STORE_DIR):
+    """
+    Backfills the claim store from the JSON report archive (src/archive.py).
+    Videos already in the store are skipped (run_pipeline and src.refresh
+    append every report they archive).
+    """
+    from src.archive import ARCHIVE_DIR, iter_archive
+    from src.segmenter import get_video_channel
+
+    known = stored_video_ids(store_dir)
+
+    written = 0
+    for path, record in iter_archive(archive_dir or ARCHIVE_DIR):
+        report = record["report"]
+        if report.get("video_id") in known:
+            continue
+
+        checked_at = datetime.fromtimestamp(os.path.getmtime(path), timezone.utc)
+        channel = get_video_channel(report.get("video_id", ""))
+        if append_report(report, channel, store_dir, checked_at):
+            written += 1
+    return written
+
+
+def compact_store(store_dir: str = CLAIM_STORE_DIR, rows_per_file: int = COMPACT_ROWS_PER_FILE):
+    """
+    Rewrites all part files as a few large ones. Run it offline (no other
+    process appending or compacting): readers listing the folder during
+    the swap could briefly see rows twice. Rows from files written before
+    run_id existed get their file's timestamp as run_id; columns added to
+    the schema later are filled with nulls.
+    """
+    pa = _require_pyarrow()
+    schema = claim_schema()
+
+    parts = sorted(
+        os.path.join(store_dir, name) for name in os.listdir(store_dir)
+        if name.endswith(".parquet")
+    )
+    if len(parts) < 2:
+        return 0
+
+    tables = []
+    for path in parts:
+        table = pa.parquet.read_table(path)
+        if "run_id" not in table.column_names:
+            stem = os.path.splitext(os.path.basename(path))[0]
+            table = table.append_column(
+                "run_id", pa.array([stem[len("part-"):]] * len(table), pa.string())
+            )
+        for field in schema:
+            if field.name not in table.column_names:
+                table = table.append_column(field.name, pa.nulls(len(table), field.type))
+        tables.append(table.select(schema.names).cast(schema))
+
+    merged = pa.concat_tables(tables).combine_chunks()
+
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+    for i, start in enumerate(range(0, len(merged), rows_per_file)):
+        _write_part(merged.slice(start, rows_per_file), store_dir, f"compact-{stamp}-{i:04d}.parquet")
+
+    for path in parts:
+        os.remove(path)
+
+    return len(parts)
+
+
+# ---------------------------------------------------
+# Query API
+# ---------------------------------------------------
+def open_store(store_dir: str = CLAIM_STORE_DIR):
+    pa = _require_pyarrow()
+    return pa.dataset.dataset(store_dir, format="parquet", schema=claim_schema())
+
+
+def latest_runs(store_dir: str = CLAIM_STORE_DIR):
+    """
+    (run_id of the most recent run of every video, videos that only have
+    rows written before run_id existed). Marker rows of runs without
+    claims count as runs.
+    """
+    table = open_store(store_dir).to_table(columns=["video_id", "run_id"])
+    latest = table.group_by("video_id").aggregate([("run_id", "max")])
+
+    run_ids, legacy_videos = [], []
+    for video_id, run_id in zip(latest["video_id"].to_pylist(), latest["run_id_max"].to_pylist()):
+        if run_id is None:
+            legacy_videos.append(video_id)
+        else:
+            run_ids.append(run_id)
+    return run_ids, legacy_videos
+
+
+def latest_run_ids(store_dir: str = CLAIM_STORE_DIR) -> list:
+    """run_id of the most recent run of every video."""
+    return latest_runs(store_dir)[0]
+
+
+def _scan(columns, expr=None, store_dir: str = CLAIM_STORE_DIR, latest_only: bool = True):
+    """
+    Reads `columns` of matching claim rows (never marker rows). With
+    latest_only, reruns of a video are ignored: only rows of its latest
+    run are returned, so a latest run without claims hides older ones.
+    Rows written before run_id existed count only for videos with no
+    later run.
+    """
+    pa = _require_pyarrow()
+    ds = pa.dataset
+    claims = ds.field("claim_key").is_valid()
+    expr = claims if expr is None else expr & claims
+
+    if latest_only:
+        run_ids, legacy_videos = latest_runs(store_dir)
+        run = ds.field("run_id")
+        # Typed arrays: an empty list would be inferred as null-typed
+        latest = (run.isin(pa.array(run_ids, pa.string()))
+                  | (run.is_null() & ds.field("video_id").isin(pa.array(legacy_videos, pa.string()))))
+        expr = expr & latest
+
+    return open_store(store_dir).to_table(columns=columns, filter=expr)
+
+
+def verdict_distribution(by: str = "channel", store_dir: str = CLAIM_STORE_DIR,
+                         latest_only: bool = True):
+    """
+    Claim counts per (`by`, verdict), e.g. per channel or per video_id.
+    Returns a pyarrow Table sorted by group then count.
+    """
+    table = _scan([by, "verdict"], store_dir=store_dir, latest_only=latest_only)
+    table = table.set_column(1, "verdict", table["verdict"].cast("string"))
+
+    result = table.group_by([by, "verdict"]).aggregate([("verdict", "count")])
+    result = result.select([by, "verdict", "verdict_count"])
+    return result.rename_columns([by, "verdict", "claims"]).sort_by(
+        [(by, "ascending"), ("claims", "descending")]
+    )
+
+
+def most_repeated_claims(verdict: str = "FALSE", limit: int = 20,
+                         channel: str = None, store_dir: str = CLAIM_STORE_DIR,
+                         latest_only: bool = True):
+    """
+    Claims with the given verdict ranked by how many times they were made
+    (all videos, or one channel), grouped by normalised sentence.
+    """
+    pa = _require_pyarrow()
+    ds = pa.dataset
+
+    expr = ds.field("verdict") == verdict
+    if channel is not None:
+        expr = expr & (ds.field("channel") == channel)
+
+    table = _scan(["claim_key", "sentence", "video_id"], expr, store_dir, latest_only)
+
+    result = table.group_by("claim_key").aggregate([
+        ("claim_key", "count"),
+        ("video_id", "count_distinct"),
+        ("sentence", "min"),
+    ])
+    result = result.select(["claim_key", "claim_key_count", "video_id_count_distinct", "sentence_min"])
+    result = result.rename_columns(["claim_key", "times_claimed", "videos", "sentence"])
+    return result.sort_by([("times_claimed", "descending")]).slice(0, limit)
+
+
+def latency_stats(by: str = None, store_dir: str = CLAIM_STORE_DIR, latest_only: bool = True):
+    """
+    LLM verification latency (ms). Overall as a dict, or per `by` group as
+    a pyarrow Table.
+    """
+    pa = _require_pyarrow()
+    pc = pa.compute
+
+    columns = ["latency_ms"] + ([by] if by else [])
+    table = _scan(columns, pa.dataset.field("latency_ms").is_valid(), store_dir, latest_only)
+    latency = table["latency_ms"]
+
+    if by is None:
+        if len(latency) == 0:
+            return {"count": 0}
+        p50, p90, p99 = pc.quantile(latency, q=[0.5, 0.9, 0.99]).to_pylist()
+        return {
+            "count": len(latency),
+            "mean": pc.mean(latency).as_py(),
+            "p50": p50,
+            "p90": p90,
+            "p99": p99,
+            "max": pc.max(latency).as_py(),
+        }
+
+    result = table.group_by(by).aggregate([
+        ("latency_ms", "count"),
+        ("latency_ms", "mean"),
+        ("latency_ms", "approximate_median"),
+        ("latency_ms", "max"),
+    ])
+    result = result.select([
+        by, "latency_ms_count", "latency_ms_mean", "latency_ms_approximate_median", "latency_ms_max"
+    ])
+    return result.rename_columns([by, "count", "mean", "p50", "max"]).sort_by(
+        [("mean", "descending")]
+    )
+
+
+def _print_table(table):
+    for row in table.to_pylist():
+        print("  ".join(f"{k}={v}" for k, v in row.items()))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query the columnar claim archive.")
+    parser.add_argument("--store", default=CLAIM_STORE_DIR, help="claim store folder")
+    parser.add_argument("--import-json", action="store_true",
+                        help="backfill from the JSON report archive first")
+    parser.add_argument("--compact", action="store_true",
+                        help="merge all part files into a few large ones first")
+    args = parser.parse_args()
+
+    if args.import_json:
+        print(f"Imported {import_json_archive(store_dir=args.store)} reports")
+
+    if args.compact:
+        print(f"Compacted {compact_store(args.store)} part files")
+
+    print("\n=== VERDICTS PER CHANNEL ===")
+    _print_table(verdict_distribution("channel", args.store))
+
+    print("\n=== MOST REPEATED FALSE CLAIMS ===")
+    _print_table(most_repeated_claims("FALSE", store_dir=args.store))
+
+    print("\n=== LLM LATENCY (ms) ===")
+    print(latency_stats(store_dir=args.store))
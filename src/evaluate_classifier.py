@@ -1,7 +1,10 @@
 # src/evaluate_classifier.py
 
 from model_loader import load_claim_classifier
+from prefilter import measure_recall, prefilter_sentences
 import json
+import sys
+import time
 
 # ------------------------------
 # 40 Benchmark Test Sentences
@@ -101,5 +104,115 @@ def evaluate():
     print(json.dumps(confusion, indent=4))
 
 
+# ------------------------------
+# Pre-filter Recall Guard
+# ------------------------------
+
+# Filler the pre-filter must drop, so the guard also exercises its rules
+PREFILTER_FILLER = [
+    "so yeah",
+    "Okay.",
+    "um, right",
+    "hey guys welcome back to the channel",
+    "Thanks for watching!",
+    "don't forget to like and subscribe",
+    "I love this video",
+    "[Music]",
+]
+
+# The pre-filter must never drop a labelled claim from TEST_DATA, from
+# these hedged, often lower-case (auto-caption) claims or from short ones
+PREFILTER_TEST_DATA = TEST_DATA + [(text, "NOT_A_CLAIM") for text in PREFILTER_FILLER] + [
+    ("Vaccines work.", "FACTUAL_CLAIM"),
+    ("Smoking kills.", "FACTUAL_CLAIM"),
+    ("vaccines cause autism", "DISPUTED_CLAIM"),
+    ("Earth is flat.", "DISPUTED_CLAIM"),
+    ("I feel like the moon landing was faked.", "DISPUTED_CLAIM"),
+    ("i love that the earth is flat", "DISPUTED_CLAIM"),
+    ("we hate how the government hides the cure for cancer", "DISPUTED_CLAIM"),
+    ("i think this vaccine changes your dna", "DISPUTED_CLAIM"),
+    ("honestly i hope you know that vaccines cause autism", "DISPUTED_CLAIM"),
+    ("i like how the sun is a star", "FACTUAL_CLAIM"),
+    ("we wish people knew that water boils at a lower temperature on mountains", "FACTUAL_CLAIM"),
+]
+MIN_PREFILTER_RECALL = 1.0
+
+
+def evaluate_prefilter():
+    recall, lost = measure_recall(PREFILTER_TEST_DATA)
+    _, dropped = prefilter_sentences([text for text, _ in PREFILTER_TEST_DATA])
+    kept_filler, _ = prefilter_sentences(PREFILTER_FILLER)
+
+    print("\n=== PRE-FILTER RECALL GUARD ===")
+    print(f"Sentences pre-filtered: {dropped}/{len(PREFILTER_TEST_DATA)}")
+    print(f"Filler dropped: {len(PREFILTER_FILLER) - len(kept_filler)}/{len(PREFILTER_FILLER)}")
+    print(f"Claim recall: {recall * 100:.2f}% (required: {MIN_PREFILTER_RECALL * 100:.2f}%)")
+
+    for text in lost:
+        print(f"Dropped claim: {text}")
+    for text in kept_filler:
+        print(f"Kept filler: {text}")
+
+    return recall >= MIN_PREFILTER_RECALL and not kept_filler
+
+
+# ------------------------------
+# Speculative Inference Guard
+# ------------------------------
+
+# Max accuracy drop allowed for windowing + early exit (1 of 40 sentences)
+SPECULATIVE_TOLERANCE = 0.025
+
+# Filler used to turn each test sentence into a long run-on caption
+RUN_ON_FILLER = "so yeah um you know like I was saying and then basically "
+
+
+def timed_predictions(classifier, texts):
+    start = time.perf_counter()
+    preds = [classifier.predict(t)[0] for t in texts]
+    return preds, time.perf_counter() - start
+
+
+def evaluate_speculative():
+    print("Loading classifier...\n")
+    classifier = load_claim_classifier()
+
+    texts = [text for text, _ in TEST_DATA]
+    expected = [label for _, label in TEST_DATA]
+
+    def accuracy(preds):
+        return sum(p == e for p, e in zip(preds, expected)) / len(expected)
+
+    full_preds, full_time = timed_predictions(classifier.with_mode(False), texts)
+
+    speculative = classifier.with_mode(True)
+    spec_preds, spec_time = timed_predictions(speculative, texts)
+    stats = dict(speculative.exit_stats)
+
+    # Long inputs: the claim buried in ~300 tokens of filler
+    long_texts = [RUN_ON_FILLER * 10 + text + " " + RUN_ON_FILLER * 10 for text in texts]
+    long_preds, long_time = timed_predictions(speculative, long_texts)
+
+    full_acc, spec_acc, long_acc = accuracy(full_preds), accuracy(spec_preds), accuracy(long_preds)
+
+    print("\n=== SPECULATIVE INFERENCE GUARD ===")
+    print(f"Full model accuracy:   {full_acc * 100:.2f}%  ({full_time / len(texts) * 1000:.1f} ms/sentence)")
+    print(f"Speculative accuracy:  {spec_acc * 100:.2f}%  ({spec_time / len(texts) * 1000:.1f} ms/sentence)")
+    print(f"Latency gain:          {full_time / spec_time:.2f}x")
+    print(f"Encoder layers run:    {stats['layers_run']}/{stats['layers_full']} "
+          f"({stats['layers_run'] / max(stats['layers_full'], 1) * 100:.1f}%)")
+    print(f"Run-on inputs (windowed) accuracy: {long_acc * 100:.2f}%  "
+          f"({long_time / len(texts) * 1000:.1f} ms/input)")
+    print(f"Allowed accuracy drop: {SPECULATIVE_TOLERANCE * 100:.2f}%")
+
+    return full_acc - spec_acc <= SPECULATIVE_TOLERANCE
+
+
 if __name__ == "__main__":
+    if "--prefilter" in sys.argv:
+        sys.exit(0 if evaluate_prefilter() else 1)
+
+    if "--speculative" in sys.argv:
+        sys.exit(0 if evaluate_speculative() else 1)
+
     evaluate()
@@ -1,31 +1,28 @@
-import subprocess
+import hashlib
 import json
 import re
 
+try:
+    from src.llm_client import LLM_BACKENDS, LLMUnavailable, get_llm_client
+except ImportError:
+    from llm_client import LLM_BACKENDS, LLMUnavailable, get_llm_client
+
+# Primary model; the others in LLM_BACKENDS are only used as fallbacks
+LLM_MODEL = LLM_BACKENDS[0]["model"]
+
+# Verdict when no backend answered (the claim was not checked at all)
+UNCHECKED = "UNCHECKED"
+
 
 # -------------------------------
-# Calls Ollama model
+# Calls the LLM (with fallbacks)
 # -------------------------------
-def ask_ollama(prompt: str, model: str = "llama3.1:8b"):
+def ask_llm(prompt: str):
     """
-    Calls the Ollama model and returns the raw response text.
-    Fully compatible with Windows terminal.
+    Returns (raw response text, name of the model that produced it).
+    Raises LLMUnavailable if every backend failed or was skipped.
     """
-
-    try:
-        result = subprocess.run(
-            ["ollama", "run", model],
-            input=prompt,
-            text=True,
-            capture_output=True,
-            encoding="utf-8",
-            errors="ignore"   # Fix Windows cp1252 UnicodeDecode errors
-        )
-
-        return result.stdout.strip()
-
-    except Exception as e:
-        return f"Error contacting Ollama: {e}"
+    return get_llm_client().generate(prompt)
 
 
 # -------------------------------
@@ -47,18 +44,9 @@ def extract_json(text: str):
 
 
 # -------------------------------
-# Fact-check a claim
+# Verification prompt
 # -------------------------------
-def verify_claim(claim: str):
-    """
-    Uses Llama 3.1 8B (via Ollama) to fact-check a claim.
-    Always returns a dict with:
-      - verdict
-      - explanation
-      - evidence
-    """
-
-    prompt = f"""
+VERIFY_PROMPT = """
 You are a factual verification assistant.
 Your job is to analyze the claim below and classify it as EXACTLY one of:
 
@@ -85,22 +73,69 @@ Respond ONLY in valid JSON with this format:
 }}
 """
 
-    raw = ask_ollama(prompt)
+
+def get_verifier_version():
+    """
+    Identifies the LLM + prompt pair that produced a verdict.
+    Changes whenever LLM_MODEL or VERIFY_PROMPT is edited.
+    """
+    prompt_hash = hashlib.sha256(VERIFY_PROMPT.encode("utf-8")).hexdigest()[:12]
+    return f"{LLM_MODEL}:{prompt_hash}"
+
+
+# -------------------------------
+# Fact-check a claim
+# -------------------------------
+def verify_claim(claim: str):
+    """
+    Uses Llama 3.1 8B (via Ollama, with fallback models) to fact-check a claim.
+    Always returns a dict with:
+      - verdict
+      - explanation
+      - evidence
+      - model   (which model produced the verdict; None if unchecked)
+    If no LLM answered, verdict is UNCHECKED and "error" is True.
+    """
+
+    prompt = VERIFY_PROMPT.format(claim=claim)
+    try:
+        raw, model = ask_llm(prompt)
+    except LLMUnavailable as e:
+        print(f"[fact_checker] No LLM available: {e}")
+        return {
+            "verdict": UNCHECKED,
+            "explanation": f"Not checked, no LLM backend available ({e})",
+            "evidence": [],
+            "model": None,
+            "error": True
+        }
 
     # Try to extract clean JSON
     data = extract_json(raw)
 
-    if data:
+    if isinstance(data, dict):
+        data["model"] = model
         return data
 
     # Fallback if model did not return valid JSON
     return {
         "verdict": "UNVERIFIABLE",
         "explanation": raw,
-        "evidence": []
+        "evidence": [],
+        "model": model
     }
 
 
+def is_final_verdict(fact_check: dict) -> bool:
+    """
+    True if the verdict came from the primary backend. Unchecked claims and
+    fallback-model verdicts are redone by `src.refresh`.
+    """
+    # Verdicts store the backend name ("model" or "model@host" over HTTP)
+    primary = get_llm_client().primary
+    return not fact_check.get("error") and fact_check.get("model", primary) == primary
+
+
 # Quick test
 if __name__ == "__main__":
     claim = "The moon landing was faked."
@@ -0,0 +1,271 @@
+# src/languages.py
+#
+# Caption language detection and per-language model routing.
+#
+# Each language gets its own spaCy segmenter and claim classifier, loaded
+# lazily on first use and kept in small LRU caches so that only a few
+# models are in memory at any time.
+
+import os
+import re
+from collections import OrderedDict
+
+DEFAULT_LANGUAGE = "en"
+
+# --- spaCy pipelines used for sentence splitting ---
+SPACY_MODELS = {
+    "en": "en_core_web_sm",
+    "de": "de_core_news_sm",
+    "es": "es_core_news_sm",
+    "fr": "fr_core_news_sm",
+    "pt": "pt_core_news_sm",
+    "it": "it_core_news_sm",
+    "nl": "nl_core_news_sm",
+    "ru": "ru_core_news_sm",
+}
+MULTILINGUAL_SPACY_MODEL = "xx_sent_ud_sm"
+
+# --- Claim classifiers; languages not listed use the multilingual model ---
+CLASSIFIER_PATHS = {
+    "en": "./model",
+}
+MULTILINGUAL_MODEL_PATH = "./model_multilingual"
+
+# Windowed, early-exit inference (ClaimClassifier speculative mode) for the
+# pipeline and refresh. Check accuracy first with:
+#   cd src && python evaluate_classifier.py --speculative
+SPECULATIVE_CLASSIFIER = False
+
+# How many models of each kind may stay loaded at once
+MAX_LOADED_SEGMENTERS = 3
+MAX_LOADED_CLASSIFIERS = 2
+
+
+# ---------------------------------------------------
+# Language detection
+# ---------------------------------------------------
+# Short stopword profiles: auto-captions have no punctuation or casing to
+# rely on, but function words are always there.
+STOPWORDS = {
+    "en": "the and is are was to of in that it you this for on with have be not they what but".split(),
+    "de": "der die das und ist nicht ich sie es ein eine zu mit auf den dem sich auch wir".split(),
+    "es": "el la los las que de y en es un una por con para no se lo como pero muy".split(),
+    "fr": "le la les des et est que qui un une pas pour dans sur avec ce il nous vous mais".split(),
+    "pt": "o a os as que de e em um uma para com não se do da no na mas muito".split(),
+    "it": "il lo la gli le che di e è un una per con non si del della nel ma sono".split(),
+    "nl": "de het een en is van dat niet ik je we zijn op met voor maar ook er".split(),
+    "ru": "и в не что на я с он как это по но они мы вы она так его же все было от то".split(),
+}
+STOPWORD_SETS = {lang: set(words) for lang, words in STOPWORDS.items()}
+
+MIN_DETECTION_SCORE = 0.05   # share of tokens that must be stopwords
+DETECTION_SAMPLE_WORDS = 2000
+
+WORD_RE = re.compile(r"[^\W\d_]+", re.UNICODE)
+
+
+def detect_language(text: str, default: str = DEFAULT_LANGUAGE) -> str:
+    """
+    Returns the ISO 639-1 code whose stopwords cover the largest share of
+    the (first DETECTION_SAMPLE_WORDS) words in `text`.
+    """
+    words = [w.lower() for w in WORD_RE.findall(text[:DETECTION_SAMPLE_WORDS * 8])]
+    words = words[:DETECTION_SAMPLE_WORDS]
+    if not words:
+        return default
+
+    best_lang, best_score = default, 0.0
+    for lang, stopwords in STOPWORD_SETS.items():
+        score = sum(1 for w in words if w in stopwords) / len(words)
+        if score > best_score:
+            best_lang, best_score = lang, score
+
+    return best_lang if best_score >= MIN_DETECTION_SCORE else default
+
+
+def language_from_caption_path(path: str):
+    """
+    yt-dlp names caption files <id>.<lang>.json3 or <id>.<lang>-orig.json3.
+    Returns the language code, or None if the name has none.
+    """
+    parts = os.path.basename(path).split(".")
+    if len(parts) < 3:
+        return None
+
+    tag = parts[-2].lower()
+    if tag.endswith("-orig"):
+        tag = tag[:-len("-orig")]
+
+    code = tag.split("-")[0]
+    return code if re.fullmatch(r"[a-z]{2,3}", code) else None
+
+
+# ---------------------------------------------------
+# Bounded LRU of loaded models
+# ---------------------------------------------------
+class ModelCache:
+    """
+    Keeps at most `maxsize` loaded models; the least recently used one is
+    dropped when a new model has to be loaded.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._models = OrderedDict()
+        self.hits = 0
+        self.loads = 0
+
+    def get(self, key, loader):
+        if key in self._models:
+            self._models.move_to_end(key)
+            self.hits += 1
+            return self._models[key]
+
+        while len(self._models) >= self.maxsize:
+            evicted, _ = self._models.popitem(last=False)
+            print(f"[languages] Unloading model: {evicted}")
+
+        model = loader()
+        self._models[key] = model
+        self.loads += 1
+        return model
+
+    def loaded(self):
+        return list(self._models)
+
+
+_segmenters = ModelCache(MAX_LOADED_SEGMENTERS)
+_classifiers = ModelCache(MAX_LOADED_CLASSIFIERS)
+
+
+# ---------------------------------------------------
+# Segmenters
+# ---------------------------------------------------
+def _load_spacy(lang: str):
+    import spacy
+
+    name = SPACY_MODELS.get(lang, MULTILINGUAL_SPACY_MODEL)
+    try:
+        return spacy.load(name)
+    except OSError:
+        pass
+
+    try:
+        import spacy.cli
+        spacy.cli.download(name)
+        return spacy.load(name)
+    except Exception:
+        # No trained pipeline available: rule-based sentence splitting
+        print(f"[languages] spaCy model {name} unavailable, using sentencizer for '{lang}'")
+        try:
+            nlp = spacy.blank(lang)
+        except Exception:
+            nlp = spacy.blank("xx")
+        nlp.add_pipe("sentencizer")
+        return nlp
+
+
+def segmenter_key(lang: str) -> str:
+    """Languages without their own pipeline share the multilingual one."""
+    return lang if lang in SPACY_MODELS else "xx"
+
+
+def get_segmenter(lang: str):
+    # Load what the cache key stands for, so a shared entry is not one
+    # language's blank pipeline
+    key = segmenter_key(lang)
+    return _segmenters.get(key, lambda: _load_spacy(key))
+
+
+# ---------------------------------------------------
+# Classifiers
+# ---------------------------------------------------
+_warned_fallbacks = set()
+
+
+def classifier_language_for(lang: str) -> str:
+    """
+    Language of the classifier used for `lang`: its own, "xx" for the
+    multilingual model, or DEFAULT_LANGUAGE when neither is installed.
+    """
+    if lang in CLASSIFIER_PATHS:
+        return lang
+
+    if os.path.exists(MULTILINGUAL_MODEL_PATH):
+        return "xx"
+
+    if lang not in _warned_fallbacks:
+        _warned_fallbacks.add(lang)
+        print(f"[languages] WARNING: no classifier for '{lang}' and {MULTILINGUAL_MODEL_PATH} "
+              f"is missing, triaging with the '{DEFAULT_LANGUAGE}' model")
+    return DEFAULT_LANGUAGE
+
+
+def classifier_path_for(lang: str) -> str:
+    return CLASSIFIER_PATHS.get(classifier_language_for(lang), MULTILINGUAL_MODEL_PATH)
+
+
+def classifier_version_for(lang: str, speculative: bool = SPECULATIVE_CLASSIFIER) -> str:
+    """
+    Triage version that get_classifier(lang) would record (default
+    speculative parameters, as get_classifier uses).
+    """
+    from src.model_loader import triage_version
+    return triage_version(classifier_path_for(lang), speculative)
+
+
+def get_classifier(lang: str, speculative: bool = SPECULATIVE_CLASSIFIER):
+    # Languages sharing one model share one cache entry
+    from src.model_loader import ClaimClassifier
+    from src.prediction_cache import get_prediction_cache
+
+    path = classifier_path_for(lang)
+    return _classifiers.get(
+        (path, speculative),
+        lambda: ClaimClassifier(path, speculative=speculative, cache=get_prediction_cache()),
+    )
+
+
+# Standalone test against the bundled sample captions (exits 1 on failure)
+if __name__ == "__main__":
+    import sys
+    import glob
+    try:
+        from src.caption_ingest import read_caption_text
+    except ImportError:
+        from caption_ingest import read_caption_text
+
+    failures = []
+
+    def check(name: str, ok: bool):
+        print(f"{name} → {'OK' if ok else 'MISMATCH'}")
+        if not ok:
+            failures.append(name)
+
+    # Detection: sample_<lang>[.<lang>-orig].json3
+    for path in sorted(glob.glob(os.path.join("samples", "captions", "*.json3"))):
+        name = os.path.basename(path)
+        expected = name.split(".")[0].rsplit("_", 1)[-1]
+        hinted = language_from_caption_path(path)
+        detected = detect_language(read_caption_text(path))
+
+        check(f"{name}: hint={hinted} detected={detected}", hinted in (None, expected) and detected == expected)
+
+    # Routing
+    check("segmenter: own pipeline for de", segmenter_key("de") == "de")
+    check("segmenter: ja and th share xx", segmenter_key("ja") == segmenter_key("th") == "xx")
+    check("classifier: en uses its own model", classifier_path_for("en") == CLASSIFIER_PATHS["en"])
+    check("classifier: ru and ja share one model", classifier_path_for("ru") == classifier_path_for("ja"))
+    fallback = classifier_language_for("ru")
+    check(f"classifier: ru fallback recorded as '{fallback}'",
+          fallback == ("xx" if os.path.exists(MULTILINGUAL_MODEL_PATH) else DEFAULT_LANGUAGE))
+
+    # LRU eviction, with stand-in models
+    cache = ModelCache(2)
+    loads = []
+    for key in ("a", "b", "a", "c", "b"):
+        cache.get(key, lambda key=key: loads.append(key) or key)
+    check("LRU: least recently used model unloaded",
+          cache.loaded() == ["c", "b"] and loads == ["a", "b", "c", "b"] and cache.hits == 1)
+
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,262 @@
+# src/llm_client.py
+#
+# Resilient LLM calls: per-call timeouts, retries with jittered backoff,
+# one circuit breaker per backend, and an ordered list of fallback
+# backends/models.
+#
+#   client = get_llm_client()
+#   text, model = client.generate(prompt)    # raises LLMUnavailable
+#
+# Latency is bounded: every generate() call stops after CALL_DEADLINE
+# seconds in total, and a backend whose breaker is open is skipped
+# immediately instead of being waited on.
+
+import json
+import time
+import random
+import threading
+import subprocess
+import http.client
+import urllib.error
+import urllib.request
+
+# --- Backends, tried in order (first = primary) ---
+#   transport "cli":  `ollama run <model>` (needs a running Ollama server)
+#   transport "http": Ollama REST API at `host`, e.g. a second machine
+LLM_BACKENDS = [
+    {"transport": "cli", "model": "llama3.1:8b"},
+    {"transport": "cli", "model": "llama3.2:3b"},
+]
+OLLAMA_HOST = "http://localhost:11434"
+
+# --- Timeouts / retries ---
+CALL_TIMEOUT = 120.0      # seconds for one attempt against one backend
+CALL_DEADLINE = 300.0     # seconds for one generate() across all backends
+MAX_RETRIES = 1           # extra attempts per backend after a fast failure
+BACKOFF_BASE = 1.0        # seconds; attempt n waits up to BACKOFF_BASE * 2**n
+BACKOFF_MAX = 10.0
+
+# --- Circuit breaker ---
+FAILURE_THRESHOLD = 3     # consecutive failures that open the breaker
+RESET_TIMEOUT = 60.0      # seconds before one trial call is let through
+
+
+class LLMError(RuntimeError):
+    """One backend call failed."""
+
+
+class LLMTimeout(LLMError):
+    """One backend call ran out of time."""
+
+
+class LLMUnavailable(RuntimeError):
+    """Every backend failed, was skipped, or the deadline passed."""
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__("; ".join(f"{name}: {err}" for name, err in errors) or "no backends")
+
+
+# ---------------------------------------------------
+# Circuit breaker
+# ---------------------------------------------------
+class CircuitBreaker:
+    """
+    closed → (FAILURE_THRESHOLD failures) → open → (RESET_TIMEOUT) →
+    half-open: one trial call; success closes, failure opens again.
+    """
+
+    def __init__(self, failure_threshold: int = FAILURE_THRESHOLD,
+                 reset_timeout: float = RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self.trial_running:
+                self.trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.trial_running or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self.trial_running = False
+
+
+# ---------------------------------------------------
+# Backends
+# ---------------------------------------------------
+class OllamaCliBackend:
+    def __init__(self, model: str):
+        self.model = model
+        self.name = model
+        self.breaker = CircuitBreaker()
+
+    def generate(self, prompt: str, timeout: float) -> str:
+        try:
+            result = subprocess.run(
+                ["ollama", "run", self.model],
+                input=prompt,
+                text=True,
+                capture_output=True,
+                encoding="utf-8",
+                errors="ignore",   # Fix Windows cp1252 UnicodeDecode errors
+                timeout=timeout,
+            )
+        except subprocess.TimeoutExpired:
+            raise LLMTimeout(f"no answer within {timeout:.0f} s")
+        except OSError as e:
+            raise LLMError(f"cannot run ollama: {e}")
+
+        text = result.stdout.strip()
+        if result.returncode != 0 or not text:
+            detail = result.stderr.strip().splitlines()[-1:] or [f"exit code {result.returncode}"]
+            raise LLMError(detail[0])
+        return text
+
+
+class OllamaHttpBackend:
+    def __init__(self, model: str, host: str = OLLAMA_HOST):
+        self.model = model
+        self.host = host.rstrip("/")
+        self.name = f"{model}@{self.host}"
+        self.breaker = CircuitBreaker()
+
+    def generate(self, prompt: str, timeout: float) -> str:
+        body = json.dumps({"model": self.model, "prompt": prompt, "stream": False}).encode("utf-8")
+        request = urllib.request.Request(
+            f"{self.host}/api/generate", data=body, headers={"Content-Type": "application/json"}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                text = json.loads(response.read().decode("utf-8")).get("response", "").strip()
+        except TimeoutError:
+            raise LLMTimeout(f"no answer within {timeout:.0f} s")
+        except urllib.error.URLError as e:
+            if isinstance(e.reason, TimeoutError):
+                raise LLMTimeout(f"no answer within {timeout:.0f} s")
+            raise LLMError(f"request failed: {e.reason}")
+        except (OSError, ValueError, http.client.HTTPException) as e:
+            # HTTPException: e.g. IncompleteRead when the server drops the connection
+            raise LLMError(f"request failed: {e}")
+
+        if not text:
+            raise LLMError("empty response")
+        return text
+
+
+def make_backend(spec: dict):
+    if spec.get("transport", "cli") == "http":
+        return OllamaHttpBackend(spec["model"], spec.get("host", OLLAMA_HOST))
+    return OllamaCliBackend(spec["model"])
+
+
+# ---------------------------------------------------
+# Client
+# ---------------------------------------------------
+def backoff_delay(attempt: int) -> float:
+    """Full jitter: uniform in [0, min(BACKOFF_MAX, BACKOFF_BASE * 2**attempt)]."""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+class LLMClient:
+    def __init__(self, backends, call_timeout: float = CALL_TIMEOUT,
+                 deadline: float = CALL_DEADLINE, max_retries: int = MAX_RETRIES):
+        self.backends = list(backends)
+        self.call_timeout = call_timeout
+        self.deadline = deadline
+        self.max_retries = max_retries
+
+    @property
+    def primary(self) -> str:
+        return self.backends[0].name
+
+    def generate(self, prompt: str):
+        """
+        Returns (text, backend name) from the first backend that answers.
+        Raises LLMUnavailable when none did within the deadline.
+        """
+        end = time.monotonic() + self.deadline
+        errors = []
+
+        for backend in self.backends:
+            if not backend.breaker.allow():
+                errors.append((backend.name, "circuit open"))
+                continue
+
+            for attempt in range(self.max_retries + 1):
+                remaining = end - time.monotonic()
+                if remaining <= 0:
+                    errors.append((backend.name, "deadline exceeded"))
+                    raise LLMUnavailable(errors)
+
+                succeeded = False
+                try:
+                    text = backend.generate(prompt, min(self.call_timeout, remaining))
+                    succeeded = True
+                except LLMTimeout as e:
+                    # Retrying an overloaded backend only piles up load
+                    error, retry = str(e), False
+                except LLMError as e:
+                    error, retry = str(e), True
+                except Exception as e:
+                    # Anything a backend did not wrap is still a failed call
+                    error, retry = f"{type(e).__name__}: {e}", True
+                finally:
+                    # Recorded even if interrupted, so a half-open breaker
+                    # never stays stuck on a trial that has ended
+                    if succeeded:
+                        backend.breaker.record_success()
+                    else:
+                        backend.breaker.record_failure()
+
+                if succeeded:
+                    return text, backend.name
+
+                errors.append((backend.name, error))
+                if not retry or attempt == self.max_retries or not backend.breaker.allow():
+                    break
+                time.sleep(min(backoff_delay(attempt), max(0.0, end - time.monotonic())))
+
+        raise LLMUnavailable(errors)
+
+    def status(self) -> list:
+        return [
+            {"backend": b.name, "state": b.breaker.state, "failures": b.breaker.failures}
+            for b in self.backends
+        ]
+
+
+_shared = None
+
+
+def get_llm_client() -> LLMClient:
+    """Process-wide client, so breaker state is shared by every caller."""
+    global _shared
+    if _shared is None:
+        _shared = LLMClient([make_backend(spec) for spec in LLM_BACKENDS])
+    return _shared
@@ -1,10 +1,95 @@
 from transformers import pipeline
+from functools import lru_cache
+import hashlib
+import copy
+import numpy as np
+import torch
 import os
 
+try:
+    from src.prediction_cache import sentence_hash
+except ImportError:
+    from prediction_cache import sentence_hash
+
 MODEL_PATH = "./model"
 
+# --- Speculative inference defaults ---
+WINDOW_TOKENS = 96      # long inputs are split into claim-sized windows
+WINDOW_STRIDE = 24      # token overlap between neighbouring windows
+EXIT_THRESHOLD = 0.9    # min softmax confidence to leave the encoder early
+EXIT_PATIENCE = 2       # consecutive layers that must agree before exiting
+MIN_EXIT_LAYER = 4      # never exit before this many layers
+
+
+@lru_cache(maxsize=None)
+def get_model_version(model_path=MODEL_PATH):
+    """
+    Content hash of every file in the model folder.
+    Changes whenever the classifier in ./model is replaced or retrained.
+    """
+    h = hashlib.sha256()
+    for name in sorted(os.listdir(model_path)):
+        full = os.path.join(model_path, name)
+        if not os.path.isfile(full):
+            continue
+
+        h.update(name.encode("utf-8"))
+        with open(full, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+
+    return h.hexdigest()[:16]
+
+
+def speculative_params(window_tokens: int = WINDOW_TOKENS, window_stride: int = WINDOW_STRIDE,
+                       exit_threshold: float = EXIT_THRESHOLD, exit_patience: int = EXIT_PATIENCE,
+                       min_exit_layer: int = MIN_EXIT_LAYER) -> str:
+    """Parameter string of a speculative mode, e.g. "spec:96:24:0.9:2:4"."""
+    return (f"spec:{window_tokens}:{window_stride}:"
+            f"{exit_threshold}:{exit_patience}:{min_exit_layer}")
+
+
+def triage_version(model_path=MODEL_PATH, speculative: bool = False, **params):
+    """
+    Version recorded for the triage stage: the model version, plus the
+    speculative parameters in speculative mode (its outputs depend on them).
+    `params` are the ClaimClassifier speculative arguments.
+    """
+    version = get_model_version(model_path)
+    return f"{version}:{speculative_params(**params)}" if speculative else version
+
+
+def convert_label(raw_label):
+    # Convert LABEL_X → X
+    if isinstance(raw_label, str) and raw_label.startswith("LABEL_"):
+        return int(raw_label.split("_")[1])
+    return raw_label
+
+
 class ClaimClassifier:
-    def __init__(self, model_path=MODEL_PATH):
+    """
+    Wraps the fine-tuned claim classifier.
+
+    With `speculative=True`:
+      - inputs longer than `window_tokens` are split into overlapping
+        windows that are classified in one batch and then combined
+        (a claim found in any window wins), instead of being truncated;
+      - each encoder layer's output is passed through the classification
+        head, and a sequence leaves the encoder once the prediction has
+        been confident and unchanged for `exit_patience` layers.
+
+    With a `cache` (src/prediction_cache.py), sentences already seen by this
+    model version and mode skip the transformer. Scores are then always
+    rounded to float16, on hits and misses alike.
+
+    The mode is fixed at construction (the cache key depends on it); use
+    `with_mode()` for a view of the same loaded model in the other mode.
+    """
+
+    def __init__(self, model_path=MODEL_PATH, speculative: bool = False,
+                 window_tokens: int = WINDOW_TOKENS, window_stride: int = WINDOW_STRIDE,
+                 exit_threshold: float = EXIT_THRESHOLD, exit_patience: int = EXIT_PATIENCE,
+                 min_exit_layer: int = MIN_EXIT_LAYER, cache=None):
         if not os.path.exists(model_path):
             raise FileNotFoundError(f"Model folder not found at {model_path}")
         
@@ -17,24 +102,233 @@ class ClaimClassifier:
             device=-1   # CPU, change to 0 for GPU
         )
 
+        self.version = get_model_version(model_path)
+
+        # Run-on caption "sentences" can exceed the model's max length; the
+        # tokenizer config does not always say what it is (RoBERTa reserves
+        # two position ids, hence the margin)
+        max_positions = getattr(self.model.model.config, "max_position_embeddings", 512)
+        self.max_length = min(self.model.tokenizer.model_max_length, max_positions - 2)
+
+        self._speculative = speculative
+        self.window_tokens = window_tokens
+        self.window_stride = window_stride
+        self.exit_threshold = exit_threshold
+        self.exit_patience = exit_patience
+        self.min_exit_layer = min_exit_layer
+
+        self.label2id = {convert_label(v): k for k, v in self.model.model.config.id2label.items()}
+        self.not_claim_id = self.label2id.get("NOT_A_CLAIM")
+
+        self.cache = cache
+        self._set_mode_tags()
+
+        # Encoder layers actually run vs. layers a full forward pass would run
+        self.exit_stats = {"sequences": 0, "layers_run": 0, "layers_full": 0}
+
         print("Model loaded successfully.")
 
+    @property
+    def speculative(self) -> bool:
+        return self._speculative
+
+    def _set_mode_tags(self):
+        # Cached outputs are only valid for the same weights and inference
+        # mode; the recorded triage version names the same parameters
+        if self._speculative:
+            params = speculative_params(self.window_tokens, self.window_stride,
+                                        self.exit_threshold, self.exit_patience,
+                                        self.min_exit_layer)
+            self.triage_version = f"{self.version}:{params}"
+            self.cache_tag = self.triage_version
+        else:
+            self.triage_version = self.version
+            self.cache_tag = f"{self.version}:full"
+
+    def with_mode(self, speculative: bool):
+        """Same loaded model and cache, other inference mode."""
+        other = copy.copy(self)
+        other._speculative = speculative
+        other.exit_stats = {"sequences": 0, "layers_run": 0, "layers_full": 0}
+        other._set_mode_tags()
+        return other
+
     def predict(self, sentence: str):
-        result = self.model(sentence)[0]
-        
+        if self.speculative or self.cache is not None:
+            return self.predict_batch([sentence])[0]
+
+        result = self.model(sentence, truncation=True, max_length=self.max_length)[0]
+
         raw_label = result["label"]        # e.g. "LABEL_1"
         score = result["score"]
-        
-        # Convert LABEL_X → X
-        if raw_label.startswith("LABEL_"):
-            label_id = int(raw_label.split("_")[1])
+
+        return convert_label(raw_label), score
+
+    def predict_batch(self, sentences, batch_size: int = 32):
+        """
+        Classifies many sentences at once. Returns [(label, score), ...].
+        """
+        sentences = list(sentences)
+        if not sentences:
+            return []
+
+        if self.cache is not None:
+            return self._predict_cached(sentences, batch_size)
+
+        return self._predict_uncached(sentences, batch_size)
+
+    def _predict_uncached(self, sentences, batch_size: int):
+        if not self.speculative:
+            results = self.model(sentences, batch_size=batch_size,
+                                 truncation=True, max_length=self.max_length)
+            return [(convert_label(r["label"]), r["score"]) for r in results]
+
+        out = []
+        for start in range(0, len(sentences), batch_size):
+            out.extend(self._predict_speculative(sentences[start:start + batch_size]))
+        return out
+
+    def _predict_cached(self, sentences, batch_size: int):
+        id2label = self.model.model.config.id2label
+        keys = np.array([sentence_hash(s, self.cache_tag) for s in sentences], dtype=np.uint64)
+        found, label_ids, scores = self.cache.get_many(keys)
+
+        out = [
+            (convert_label(id2label[int(l)]), float(s)) if hit else None
+            for hit, l, s in zip(found, label_ids, scores)
+        ]
+
+        # Run the model once per distinct missing sentence
+        missing = {}
+        for i, hit in enumerate(found):
+            if not hit:
+                missing.setdefault(int(keys[i]), []).append(i)
+
+        if missing:
+            firsts = [rows[0] for rows in missing.values()]
+            predictions = self._predict_uncached([sentences[i] for i in firsts], batch_size)
+
+            for (key, rows), (label, score) in zip(missing.items(), predictions):
+                score = float(np.float16(score))
+                self.cache.put(key, self.label2id[label], score)
+                for i in rows:
+                    out[i] = (label, score)
+
+        return out
+
+    # -----------------------------
+    # Speculative inference
+    # -----------------------------
+    def _predict_speculative(self, sentences):
+        enc = self.model.tokenizer(
+            sentences,
+            max_length=self.window_tokens,
+            stride=self.window_stride,
+            truncation=True,
+            padding=True,
+            return_overflowing_tokens=True,
+            return_tensors="pt",
+        )
+        owner = enc["overflow_to_sample_mapping"]
+
+        probs = self._early_exit_forward(enc["input_ids"], enc["attention_mask"])
+
+        return [self._combine_windows(probs[owner == i]) for i in range(len(sentences))]
+
+    def _combine_windows(self, probs):
+        """
+        One window: its prediction. Several windows of one long input: the
+        most confident claim window if any window found a claim, otherwise
+        the mean over windows.
+        """
+        id2label = self.model.model.config.id2label
+        labels = probs.argmax(-1)
+
+        if self.not_claim_id is not None:
+            claim_rows = (labels != self.not_claim_id).nonzero().flatten().tolist()
+            if claim_rows:
+                best = max(claim_rows, key=lambda k: probs[k, labels[k]].item())
+                idx = labels[best].item()
+                return convert_label(id2label[idx]), probs[best, idx].item()
+
+        mean = probs.mean(0)
+        idx = mean.argmax().item()
+        return convert_label(id2label[idx]), mean[idx].item()
+
+    def _early_exit_forward(self, input_ids, attention_mask):
+        """
+        Runs the encoder layer by layer, dropping each sequence from the
+        batch once its prediction is settled. Returns softmax probabilities.
+        """
+        model = self.model.model
+        base = getattr(model, model.base_model_prefix, None)
+        layers = getattr(getattr(base, "encoder", None), "layer", None)
+
+        n = input_ids.shape[0]
+
+        # Not a BERT-style encoder: plain full forward pass
+        if layers is None or not hasattr(model, "classifier"):
+            with torch.inference_mode():
+                logits = model(input_ids=input_ids, attention_mask=attention_mask).logits
+            self._record_exits(n, n * 1, 1)
+            return logits.softmax(-1)
+
+        # BERT classifies the pooled output, RoBERTa's head reads [CLS] itself
+        pooler = getattr(base, "pooler", None)
+        if pooler is not None and isinstance(model.classifier, torch.nn.Linear):
+            head = lambda h: model.classifier(pooler(h))
         else:
-            label_id = raw_label
+            head = model.classifier
+
+        total_layers = len(layers)
+        final = torch.zeros(n, model.config.num_labels)
+        active = torch.arange(n)
+        prev = torch.full((n,), -1, dtype=torch.long)
+        streak = torch.zeros(n, dtype=torch.long)
+        layers_run = 0
+
+        with torch.inference_mode():
+            hidden = base.embeddings(input_ids=input_ids)
+            # Additive [batch, 1, 1, seq] mask: 0 for tokens, -inf-ish for padding
+            dtype = hidden.dtype
+            mask = (1.0 - attention_mask[:, None, None, :].to(dtype)) * torch.finfo(dtype).min
+
+            for depth, layer in enumerate(layers, start=1):
+                out = layer(hidden, attention_mask=mask)
+                hidden = out[0] if isinstance(out, tuple) else out
+
+                if depth < self.min_exit_layer and depth < total_layers:
+                    continue
+
+                probs = head(hidden).softmax(-1)
+                conf, pred = probs.max(-1)
+
+                streak[active] = torch.where(pred == prev[active], streak[active] + 1, 1)
+                prev[active] = pred
+
+                exit_now = (conf >= self.exit_threshold) & (streak[active] >= self.exit_patience)
+                if depth == total_layers:
+                    exit_now[:] = True
+
+                final[active[exit_now]] = probs[exit_now]
+                layers_run += depth * int(exit_now.sum())
+
+                keep = ~exit_now
+                active, hidden, mask = active[keep], hidden[keep], mask[keep]
+                if len(active) == 0:
+                    break
+
+        self._record_exits(n, layers_run, total_layers)
+        return final
+
+    def _record_exits(self, sequences: int, layers_run: int, total_layers: int):
+        self.exit_stats["sequences"] += sequences
+        self.exit_stats["layers_run"] += layers_run
+        self.exit_stats["layers_full"] += sequences * total_layers
 
-        return label_id, score
 
-def load_claim_classifier():
-    return ClaimClassifier()
+def load_claim_classifier(**kwargs):
+    return ClaimClassifier(**kwargs)
         
 
 if __name__ == "__main__":
@@ -0,0 +1,307 @@
+# src/pdf_fonts.py
+#
+# TrueType fonts for the native PDF export.
+#
+# The standard PDF fonts only cover WinAnsi (Western European) text, so
+# report text is drawn with an embedded TrueType font instead: a Type0
+# font with Identity-H encoding over a CIDFontType2 whose CIDs are the
+# UTF-16 code units of the text. Content strings are therefore plain
+# UTF-16BE, /CIDToGIDMap maps each CID to the font's glyph, and a
+# /ToUnicode CMap keeps the text searchable and copyable.
+#
+# Only the glyphs a report uses are embedded: unused glyph outlines are
+# emptied (glyph ids stay the same), everything else is copied as is.
+#
+# Fonts are looked up by file name in PDF_FONT_DIR (environment) and the
+# usual system font folders, e.g. DejaVu (`apt install fonts-dejavu-core`),
+# Noto Sans, Liberation Sans or Arial.
+
+import os
+import struct
+import hashlib
+from functools import lru_cache
+
+# Candidate files per style, first one found wins
+FONT_FILES = {
+    "regular": ["DejaVuSans.ttf", "NotoSans-Regular.ttf", "LiberationSans-Regular.ttf",
+                "arial.ttf", "Arial.ttf"],
+    "bold": ["DejaVuSans-Bold.ttf", "NotoSans-Bold.ttf", "LiberationSans-Bold.ttf",
+             "arialbd.ttf", "Arial Bold.ttf"],
+    "italic": ["DejaVuSans-Oblique.ttf", "NotoSans-Italic.ttf", "LiberationSans-Italic.ttf",
+               "ariali.ttf", "Arial Italic.ttf"],
+}
+
+FONT_DIRS = [
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "fonts"),
+    "/usr/share/fonts",
+    "/usr/local/share/fonts",
+    os.path.expanduser("~/.fonts"),
+    os.path.expanduser("~/.local/share/fonts"),
+    "/Library/Fonts",
+    "/System/Library/Fonts/Supplemental",
+    os.path.join(os.environ.get("WINDIR", r"C:\Windows"), "Fonts"),
+]
+
+# Tables a PDF viewer needs from an embedded TrueType font
+EMBED_TABLES = (b"head", b"hhea", b"maxp", b"hmtx", b"loca", b"glyf", b"cvt ", b"fpgm", b"prep")
+
+# Composite glyph flags
+ARG_1_AND_2_ARE_WORDS = 0x0001
+WE_HAVE_A_SCALE = 0x0008
+MORE_COMPONENTS = 0x0020
+WE_HAVE_AN_X_AND_Y_SCALE = 0x0040
+WE_HAVE_A_TWO_BY_TWO = 0x0080
+
+REPLACEMENT_CHAR = "\ufffd"
+
+
+# ---------------------------------------------------
+# Font lookup
+# ---------------------------------------------------
+def _search_dirs():
+    dirs = [os.environ["PDF_FONT_DIR"]] if os.environ.get("PDF_FONT_DIR") else []
+    return dirs + FONT_DIRS
+
+
+@lru_cache(maxsize=None)
+def _font_index():
+    """Lower-cased file name → path, for every font file in the search dirs."""
+    index = {}
+    for folder in _search_dirs():
+        for root, _, names in os.walk(folder):
+            for name in names:
+                index.setdefault(name.lower(), os.path.join(root, name))
+    return index
+
+
+@lru_cache(maxsize=None)
+def find_font(style: str):
+    """
+    Loaded TrueTypeFont for "regular", "bold" or "italic", or None if no
+    usable font file is installed.
+    """
+    index = _font_index()
+    for name in FONT_FILES[style]:
+        path = index.get(name.lower())
+        if not path:
+            continue
+        try:
+            return TrueTypeFont(path)
+        except (OSError, ValueError, struct.error) as e:
+            print(f"[pdf_fonts] Skipping {path}: {e}")
+    return None
+
+
+# ---------------------------------------------------
+# TrueType parsing
+# ---------------------------------------------------
+class TrueTypeFont:
+    """
+    Metrics, character map and glyph outlines of one .ttf file.
+    Widths are in PDF glyph units (1/1000 em).
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self.data = data = f.read()
+
+        version, num_tables = struct.unpack(">IH", data[:6])
+        if version not in (0x00010000, 0x74727565):     # 1.0 or 'true'
+            raise ValueError("not a TrueType outline font")
+
+        self.tables = {}
+        for i in range(num_tables):
+            tag, _, offset, length = struct.unpack(">4sIII", data[12 + 16 * i:28 + 16 * i])
+            self.tables[tag] = (offset, length)
+
+        name = os.path.splitext(os.path.basename(path))[0]
+        self.name = "".join(ch for ch in name if ch.isalnum() or ch == "-")
+
+        head = self._table(b"head")
+        self.units_per_em = struct.unpack(">H", head[18:20])[0]
+        self.bbox = struct.unpack(">hhhh", head[36:44])
+        self.long_loca = struct.unpack(">h", head[50:52])[0] == 1
+
+        hhea = self._table(b"hhea")
+        self.ascent, self.descent = struct.unpack(">hh", hhea[4:8])
+        n_metrics = struct.unpack(">H", hhea[34:36])[0]
+        self.num_glyphs = struct.unpack(">H", self._table(b"maxp")[4:6])[0]
+
+        self.cap_height = self.ascent
+        if b"OS/2" in self.tables:
+            os2 = self._table(b"OS/2")
+            if struct.unpack(">H", os2[:2])[0] >= 2 and len(os2) >= 90:
+                self.cap_height = struct.unpack(">h", os2[88:90])[0]
+
+        self.italic_angle = 0.0
+        if b"post" in self.tables:
+            self.italic_angle = struct.unpack(">i", self._table(b"post")[4:8])[0] / 65536
+
+        hmtx = self._table(b"hmtx")
+        advances = [struct.unpack(">H", hmtx[4 * i:4 * i + 2])[0] for i in range(n_metrics)]
+        advances += [advances[-1]] * (self.num_glyphs - n_metrics)
+        self.advances = [a * 1000 / self.units_per_em for a in advances]
+
+        self.cmap = self._parse_cmap()
+        # Per-character width, for text measurement; unmapped → .notdef
+        self.widths = {chr(cp): self.advances[gid] for cp, gid in self.cmap.items()}
+        self.missing_width = self.advances[0]
+
+    def _table(self, tag: bytes) -> bytes:
+        offset, length = self.tables[tag]
+        return self.data[offset:offset + length]
+
+    def scale(self, value: float) -> int:
+        return round(value * 1000 / self.units_per_em)
+
+    def _parse_cmap(self) -> dict:
+        cmap = self._table(b"cmap")
+        n = struct.unpack(">H", cmap[2:4])[0]
+
+        subtables = {}
+        for i in range(n):
+            platform, encoding, offset = struct.unpack(">HHI", cmap[4 + 8 * i:12 + 8 * i])
+            fmt = struct.unpack(">H", cmap[offset:offset + 2])[0]
+            subtables[(platform, encoding, fmt)] = offset
+
+        # Full Unicode first, then the BMP
+        for key in ((3, 10, 12), (0, 4, 12), (0, 6, 12), (3, 1, 4), (0, 3, 4), (0, 1, 4), (0, 0, 4)):
+            if key in subtables:
+                parse = self._cmap_format12 if key[2] == 12 else self._cmap_format4
+                return parse(cmap, subtables[key])
+
+        raise ValueError("no Unicode character map")
+
+    @staticmethod
+    def _cmap_format4(cmap: bytes, offset: int) -> dict:
+        seg_count = struct.unpack(">H", cmap[offset + 6:offset + 8])[0] // 2
+        ends_at = offset + 14
+        starts_at = ends_at + 2 * seg_count + 2
+        deltas_at = starts_at + 2 * seg_count
+        ranges_at = deltas_at + 2 * seg_count
+
+        ends = struct.unpack(f">{seg_count}H", cmap[ends_at:ends_at + 2 * seg_count])
+        starts = struct.unpack(f">{seg_count}H", cmap[starts_at:starts_at + 2 * seg_count])
+        deltas = struct.unpack(f">{seg_count}h", cmap[deltas_at:deltas_at + 2 * seg_count])
+        ranges = struct.unpack(f">{seg_count}H", cmap[ranges_at:ranges_at + 2 * seg_count])
+
+        mapping = {}
+        for i in range(seg_count):
+            for cp in range(starts[i], min(ends[i], 0xFFFE) + 1):
+                if ranges[i] == 0:
+                    gid = (cp + deltas[i]) & 0xFFFF
+                else:
+                    at = ranges_at + 2 * i + ranges[i] + 2 * (cp - starts[i])
+                    gid = struct.unpack(">H", cmap[at:at + 2])[0]
+                    if gid:
+                        gid = (gid + deltas[i]) & 0xFFFF
+                if gid:
+                    mapping[cp] = gid
+        return mapping
+
+    @staticmethod
+    def _cmap_format12(cmap: bytes, offset: int) -> dict:
+        n_groups = struct.unpack(">I", cmap[offset + 12:offset + 16])[0]
+        mapping = {}
+        for i in range(n_groups):
+            at = offset + 16 + 12 * i
+            start, end, gid = struct.unpack(">III", cmap[at:at + 12])
+            # CIDs are UTF-16 code units: only the BMP can be drawn
+            for cp in range(start, min(end, 0xFFFF) + 1):
+                if gid + cp - start:
+                    mapping[cp] = gid + cp - start
+        return mapping
+
+    # -----------------------------
+    # Subsetting
+    # -----------------------------
+    def _glyph_ranges(self):
+        loca = self._table(b"loca")
+        count = self.num_glyphs + 1
+        if self.long_loca:
+            return struct.unpack(f">{count}I", loca[:4 * count])
+        return [x * 2 for x in struct.unpack(f">{count}H", loca[:2 * count])]
+
+    def _components(self, glyph: bytes):
+        """Glyph ids a composite glyph is built from."""
+        if len(glyph) < 10 or struct.unpack(">h", glyph[:2])[0] >= 0:
+            return
+
+        at = 10
+        while True:
+            flags, gid = struct.unpack(">HH", glyph[at:at + 4])
+            yield gid
+            at += 4 + (4 if flags & ARG_1_AND_2_ARE_WORDS else 2)
+            if flags & WE_HAVE_A_SCALE:
+                at += 2
+            elif flags & WE_HAVE_AN_X_AND_Y_SCALE:
+                at += 4
+            elif flags & WE_HAVE_A_TWO_BY_TWO:
+                at += 8
+            if not flags & MORE_COMPONENTS:
+                break
+
+    def subset(self, gids) -> bytes:
+        """
+        Font file keeping only the outlines of `gids` (plus .notdef and the
+        parts of composite glyphs). Glyph ids are unchanged.
+        """
+        glyf = self._table(b"glyf")
+        offsets = self._glyph_ranges()
+
+        keep = set()
+        pending = [0] + [g for g in gids if g < self.num_glyphs]
+        while pending:
+            gid = pending.pop()
+            if gid in keep:
+                continue
+            keep.add(gid)
+            pending.extend(self._components(glyf[offsets[gid]:offsets[gid + 1]]))
+
+        new_glyf = bytearray()
+        new_loca = [0]
+        for gid in range(self.num_glyphs):
+            if gid in keep:
+                new_glyf += glyf[offsets[gid]:offsets[gid + 1]]
+                new_glyf += b"\0" * (-len(new_glyf) % 4)
+            new_loca.append(len(new_glyf))
+
+        tables = {tag: self._table(tag) for tag in EMBED_TABLES if tag in self.tables}
+        tables[b"glyf"] = bytes(new_glyf)
+        tables[b"loca"] = struct.pack(f">{len(new_loca)}I", *new_loca)
+        # Long loca offsets, and no stale checksum adjustment
+        head = bytearray(tables[b"head"])
+        head[8:12] = b"\0\0\0\0"
+        head[50:52] = struct.pack(">h", 1)
+        tables[b"head"] = bytes(head)
+
+        return _build_sfnt(tables)
+
+    def subset_tag(self, gids) -> str:
+        """Six capital letters naming a subset, as PDF requires."""
+        digest = hashlib.md5(self.name.encode("utf-8") + bytes(str(sorted(gids)), "ascii")).digest()
+        return "".join(chr(ord("A") + b % 26) for b in digest[:6])
+
+
+def _checksum(data: bytes) -> int:
+    data += b"\0" * (-len(data) % 4)
+    return sum(struct.unpack(f">{len(data) // 4}I", data)) & 0xFFFFFFFF
+
+
+def _build_sfnt(tables: dict) -> bytes:
+    tags = sorted(tables)
+    num = len(tags)
+    entry_selector = max(num.bit_length() - 1, 0)
+    search_range = 16 * (1 << entry_selector)
+
+    header = struct.pack(">IHHHH", 0x00010000, num, search_range, entry_selector,
+                         num * 16 - search_range)
+    records = []
+    body = bytearray()
+    offset = 12 + 16 * num
+    for tag in tags:
+        data = tables[tag]
+        records.append(struct.pack(">4sIII", tag, _checksum(data), offset + len(body), len(data)))
+        body += data + b"\0" * (-len(data) % 4)
+
+    return header + b"".join(records) + bytes(body)
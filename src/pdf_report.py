@@ -0,0 +1,497 @@
+# src/pdf_report.py
+#
+# Native PDF export: builds the PDF directly from the report dict, with no
+# wkhtmltopdf binary and no temporary HTML file.
+#
+# Pages are written to the output stream as soon as they are full, so
+# memory use is one page of drawing operators plus one xref offset per
+# PDF object, however large the report is.
+#
+# Text is drawn with an embedded TrueType font (see pdf_fonts.py), so any
+# script the font covers comes out right. Only if no TrueType font is
+# installed does it fall back to the standard Helvetica fonts, which can
+# only show Western European text.
+
+import zlib
+from functools import lru_cache
+from itertools import repeat
+from typing import Dict, BinaryIO
+
+try:
+    from src.report_generator import verdict_css
+    from src.pdf_fonts import find_font, REPLACEMENT_CHAR
+except ImportError:
+    from report_generator import verdict_css
+    from pdf_fonts import find_font, REPLACEMENT_CHAR
+
+# ---------------------------------------
+# PAGE GEOMETRY (A4, points)
+# ---------------------------------------
+PAGE_WIDTH = 595
+PAGE_HEIGHT = 842
+MARGIN = 50
+CARD_INDENT = 12
+
+FONT_SIZE = 10
+LINE_HEIGHT = 13
+
+# Resource name → (TrueType style, standard font used if none is installed)
+FONTS = {
+    "F1": ("regular", "Helvetica"),
+    "F2": ("bold", "Helvetica-Bold"),
+    "F3": ("italic", "Helvetica-Oblique"),
+}
+
+# Left-bar colours, same palette as the HTML report
+VERDICT_COLORS = {
+    "true": (0.133, 0.773, 0.369),
+    "false": (0.937, 0.267, 0.267),
+    "partial": (0.961, 0.620, 0.043),
+    "unv": (0.580, 0.639, 0.722),
+}
+
+# Helvetica advance widths (1/1000 em) for ASCII 32..126, for the fallback
+HELVETICA_WIDTHS = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+]
+DEFAULT_WIDTH = 556
+BOLD_FACTOR = 1.06   # Helvetica-Bold is slightly wider; used as a safe upper bound
+
+
+class StandardFont:
+    """Metrics of a non-embedded Helvetica face (WinAnsi text only)."""
+
+    def __init__(self, base: str):
+        self.base = base
+        factor = BOLD_FACTOR if "Bold" in base else 1.0
+        self.widths = {chr(32 + i): w * factor for i, w in enumerate(HELVETICA_WIDTHS)}
+        self.missing_width = DEFAULT_WIDTH * factor
+
+
+@lru_cache(maxsize=None)
+def get_fonts() -> Dict:
+    """
+    Resource name → TrueTypeFont, or StandardFont when no TrueType font is
+    installed. Resolved once per process.
+    """
+    fonts = {}
+    for name, (style, base) in FONTS.items():
+        fonts[name] = find_font(style) or find_font("regular") or StandardFont(base)
+
+    if any(isinstance(f, StandardFont) for f in fonts.values()):
+        print("[pdf_report] No TrueType font found (install fonts-dejavu-core or set "
+              "PDF_FONT_DIR): text outside Western European scripts will show as '?'")
+    return fonts
+
+
+def text_width(text: str, size: float, font: str = "F1") -> float:
+    metrics = get_fonts()[font]
+    return sum(map(metrics.widths.get, text, repeat(metrics.missing_width))) * size / 1000
+
+
+def wrap_text(text: str, width: float, size: float, font: str = "F1"):
+    """
+    Greedy word wrap. Words longer than a full line are split by character.
+    Each word is measured once; line widths are accumulated.
+    """
+    metrics = get_fonts()[font]
+    widths, missing = metrics.widths, metrics.missing_width
+    scale = size / 1000
+
+    lines = []
+    current = []
+    current_width = 0.0
+    space = text_width(" ", size, font)
+
+    for word in text.split():
+        w = sum(map(widths.get, word, repeat(missing))) * scale
+        added = w + space if current else w
+
+        if current_width + added <= width:
+            current.append(word)
+            current_width += added
+            continue
+
+        if current:
+            lines.append(" ".join(current))
+            current = []
+            current_width = 0.0
+
+        # Split words that do not fit on a line of their own
+        while w > width:
+            part_width = 0.0
+            cut = 0
+            for ch in word:
+                ch_width = widths.get(ch, missing) * size / 1000
+                if part_width + ch_width > width and cut > 0:
+                    break
+                part_width += ch_width
+                cut += 1
+            lines.append(word[:cut])
+            word = word[cut:]
+            w -= part_width
+
+        current = [word]
+        current_width = w
+
+    if current:
+        lines.append(" ".join(current))
+
+    return lines or [""]
+
+
+def pdf_string(text: str) -> bytes:
+    """
+    Encodes text as a PDF literal string in WinAnsi (cp1252), for the
+    standard fonts. Characters outside cp1252 become '?'.
+    """
+    raw = text.encode("cp1252", errors="replace")
+    raw = raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+    raw = raw.replace(b"\r", b" ").replace(b"\n", b" ")
+    return b"(" + raw + b")"
+
+
+def to_unicode_cmap(cids) -> bytes:
+    """
+    /ToUnicode CMap for fonts whose CIDs are UTF-16 code units: an identity
+    range for every 256-code block in use.
+    """
+    blocks = sorted({cid >> 8 for cid in cids})
+    lines = [
+        "/CIDInit /ProcSet findresource begin",
+        "12 dict begin",
+        "begincmap",
+        "/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def",
+        "/CMapName /Adobe-Identity-UCS def",
+        "/CMapType 2 def",
+        "1 begincodespacerange",
+        "<0000> <FFFF>",
+        "endcodespacerange",
+    ]
+    # At most 100 entries per bfrange section
+    for i in range(0, len(blocks), 100):
+        chunk = blocks[i:i + 100]
+        lines.append(f"{len(chunk)} beginbfrange")
+        lines += [f"<{b:02X}00> <{b:02X}FF> <{b:02X}00>" for b in chunk]
+        lines.append("endbfrange")
+    lines += [
+        "endcmap",
+        "CMapName currentdict /CMap defineresource pop",
+        "end",
+        "end",
+    ]
+    return "\n".join(lines).encode("ascii")
+
+
+# ---------------------------------------
+# LOW-LEVEL STREAMING PDF WRITER
+# ---------------------------------------
+class PdfStreamWriter:
+    """
+    Writes PDF objects straight to a binary stream.
+
+    Object numbers 1 (catalog) and 2 (page tree) are reserved and written
+    last, once the page count is known; PDF allows objects in any order
+    as long as the xref table points at them.
+    """
+
+    CATALOG = 1
+    PAGES = 2
+
+    def __init__(self, stream: BinaryIO):
+        self.stream = stream
+        self.offsets = [0, 0, 0]   # index = object number; 1 and 2 filled in at close()
+        self.page_ids = []
+        self.position = 0
+        self.next_id = 3
+
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+        # Embedded fonts are written at close(), once it is known which
+        # characters they have to cover; their object numbers are reserved
+        self.fonts = get_fonts()
+        self.font_ids = {}
+        self.used_chars = {}
+        for name, font in self.fonts.items():
+            if isinstance(font, StandardFont):
+                self.font_ids[name] = self._object(
+                    f"<< /Type /Font /Subtype /Type1 /BaseFont /{font.base} "
+                    f"/Encoding /WinAnsiEncoding >>".encode("ascii")
+                )
+            else:
+                self.font_ids[name] = self._reserve()
+                self.used_chars[name] = set()
+
+    def _reserve(self) -> int:
+        obj_id = self.next_id
+        self.next_id += 1
+        self.offsets.append(0)
+        return obj_id
+
+    def text_operand(self, font: str, text: str) -> bytes:
+        """String operand for a Tj drawing `text` in `font`."""
+        used = self.used_chars.get(font)
+        if used is None:
+            return pdf_string(text)
+
+        text = text.replace("\r", " ").replace("\n", " ")
+        if not text.isascii():
+            # CIDs are UTF-16 code units: characters outside the BMP cannot be drawn
+            text = "".join(ch if ch < "\ud800" or "\ue000" <= ch <= "\uffff" else REPLACEMENT_CHAR
+                           for ch in text)
+        used.update(text)
+        return b"<" + text.encode("utf-16-be").hex().encode("ascii") + b">"
+
+    def _write(self, data: bytes):
+        self.stream.write(data)
+        self.position += len(data)
+
+    def _object(self, body: bytes, obj_id: int = None) -> int:
+        if obj_id is None:
+            obj_id = self.next_id
+            self.next_id += 1
+
+        if obj_id < len(self.offsets):
+            self.offsets[obj_id] = self.position
+        else:
+            self.offsets.append(self.position)
+        self._write(f"{obj_id} 0 obj\n".encode("ascii") + body + b"\nendobj\n")
+        return obj_id
+
+    def add_page(self, content: bytes):
+        data = zlib.compress(content)
+        content_id = self._object(
+            f"<< /Length {len(data)} /Filter /FlateDecode >>\nstream\n".encode("ascii")
+            + data + b"\nendstream"
+        )
+
+        fonts = " ".join(f"/{name} {oid} 0 R" for name, oid in self.font_ids.items())
+        page_id = self._object(
+            f"<< /Type /Page /Parent {self.PAGES} 0 R "
+            f"/MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << {fonts} >> >> "
+            f"/Contents {content_id} 0 R >>".encode("ascii")
+        )
+        self.page_ids.append(page_id)
+
+    def _stream(self, data: bytes, extra: str = "") -> int:
+        data = zlib.compress(data)
+        return self._object(
+            f"<< /Length {len(data)} /Filter /FlateDecode{extra} >>\nstream\n".encode("ascii")
+            + data + b"\nendstream"
+        )
+
+    def _write_truetype(self, name: str):
+        """Type0 font over a CIDFontType2 subset, CID = UTF-16 code unit."""
+        font = self.fonts[name]
+        cids = sorted(ord(ch) for ch in self.used_chars[name])
+        gids = {cid: font.cmap.get(cid, 0) for cid in cids}
+        base = f"{font.subset_tag(gids.values())}+{font.name}"
+
+        font_file = font.subset(set(gids.values()))
+        file_id = self._stream(font_file, f" /Length1 {len(font_file)}")
+
+        flags = 32 | (64 if font.italic_angle else 0)     # nonsymbolic (+ italic)
+        bbox = " ".join(str(font.scale(v)) for v in font.bbox)
+        descriptor_id = self._object(
+            f"<< /Type /FontDescriptor /FontName /{base} /Flags {flags} /FontBBox [{bbox}] "
+            f"/ItalicAngle {font.italic_angle:g} /Ascent {font.scale(font.ascent)} "
+            f"/Descent {font.scale(font.descent)} /CapHeight {font.scale(font.cap_height)} "
+            f"/StemV 80 /FontFile2 {file_id} 0 R >>".encode("ascii")
+        )
+
+        cid_to_gid = bytearray(2 * (cids[-1] + 1 if cids else 1))
+        for cid, gid in gids.items():
+            cid_to_gid[2 * cid:2 * cid + 2] = gid.to_bytes(2, "big")
+        map_id = self._stream(bytes(cid_to_gid))
+
+        # Widths of consecutive CIDs grouped: c [w1 w2 ...]
+        runs = []
+        for cid in cids:
+            width = str(round(font.advances[gids[cid]]))
+            if runs and runs[-1][0] + len(runs[-1][1]) == cid:
+                runs[-1][1].append(width)
+            else:
+                runs.append((cid, [width]))
+        widths = " ".join(f"{start} [{' '.join(ws)}]" for start, ws in runs)
+
+        cid_font_id = self._object(
+            f"<< /Type /Font /Subtype /CIDFontType2 /BaseFont /{base} "
+            f"/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) /Supplement 0 >> "
+            f"/FontDescriptor {descriptor_id} 0 R /DW {round(font.missing_width)} "
+            f"/W [{widths}] /CIDToGIDMap {map_id} 0 R >>".encode("ascii")
+        )
+
+        to_unicode_id = self._stream(to_unicode_cmap(cids))
+        self._object(
+            f"<< /Type /Font /Subtype /Type0 /BaseFont /{base} /Encoding /Identity-H "
+            f"/DescendantFonts [{cid_font_id} 0 R] /ToUnicode {to_unicode_id} 0 R >>".encode("ascii"),
+            self.font_ids[name],
+        )
+
+    def close(self):
+        for name in self.used_chars:
+            self._write_truetype(name)
+
+        kids = " ".join(f"{pid} 0 R" for pid in self.page_ids)
+        self._object(
+            f"<< /Type /Pages /Kids [{kids}] /Count {len(self.page_ids)} >>".encode("ascii"),
+            self.PAGES,
+        )
+        self._object(
+            f"<< /Type /Catalog /Pages {self.PAGES} 0 R >>".encode("ascii"),
+            self.CATALOG,
+        )
+
+        xref_at = self.position
+        size = self.next_id
+        lines = [f"xref\n0 {size}\n", "0000000000 65535 f \n"]
+        for obj_id in range(1, size):
+            lines.append(f"{self.offsets[obj_id]:010d} 00000 n \n")
+        self._write("".join(lines).encode("ascii"))
+
+        self._write(
+            f"trailer\n<< /Size {size} /Root {self.CATALOG} 0 R >>\n"
+            f"startxref\n{xref_at}\n%%EOF\n".encode("ascii")
+        )
+
+
+# ---------------------------------------
+# REPORT LAYOUT
+# ---------------------------------------
+class PdfReportWriter:
+    """
+    Lays out a fact-check report as text pages, flushing each page to the
+    underlying PdfStreamWriter as soon as it is full.
+    """
+
+    def __init__(self, stream: BinaryIO):
+        self.pdf = PdfStreamWriter(stream)
+        self.ops = []
+        self.y = PAGE_HEIGHT - MARGIN
+
+        # Open card: (top y on this page, bar colour)
+        self.card = None
+
+    # -----------------------------
+    # Page handling
+    # -----------------------------
+    def _flush_page(self):
+        # A card split across pages gets its bar closed on this page
+        # and reopened at the top of the next one
+        if self.card:
+            self._bar(self.card[0], self.y - 3, self.card[1])
+
+        if self.ops:
+            self.pdf.add_page(b"\n".join(self.ops))
+        self.ops = []
+        self.y = PAGE_HEIGHT - MARGIN
+
+        if self.card:
+            self.card = (self.y, self.card[1])
+
+    def _ensure_space(self, height: float):
+        if self.y - height < MARGIN:
+            self._flush_page()
+
+    # -----------------------------
+    # Drawing primitives
+    # -----------------------------
+    def _text(self, x: float, text: str, font: str = "F1", size: float = FONT_SIZE):
+        self.ops.append(
+            b"BT /" + font.encode("ascii") + f" {size} Tf {x:.1f} {self.y:.1f} Td ".encode("ascii")
+            + self.pdf.text_operand(font, text) + b" Tj ET"
+        )
+
+    def _bar(self, top: float, bottom: float, color):
+        r, g, b = color
+        self.ops.append(
+            f"{r} {g} {b} rg {MARGIN:.1f} {bottom:.1f} 4 {top - bottom:.1f} re f 0 g".encode("ascii")
+        )
+
+    def heading(self, text: str, size: float = 14):
+        self._ensure_space(size * 2.5)
+        self.y -= size * 1.5
+        self._text(MARGIN, text, "F2", size)
+        self.y -= size * 0.5
+
+    def paragraph(self, label: str, text: str, font: str = "F1", x: float = MARGIN):
+        """
+        Bold label followed by wrapped text. Returns after the last line.
+        """
+        width = PAGE_WIDTH - MARGIN - x
+        lines = wrap_text(f"{label} {text}" if label else text, width, FONT_SIZE, font)
+        for i, line in enumerate(lines):
+            self._ensure_space(LINE_HEIGHT)
+            self.y -= LINE_HEIGHT
+
+            if i == 0 and label and line.startswith(label):
+                self._text(x, label, "F2")
+                rest = line[len(label):]
+                self._text(x + text_width(label, FONT_SIZE, "F2"), rest, font)
+            else:
+                self._text(x, line, font)
+
+    # -----------------------------
+    # Report blocks
+    # -----------------------------
+    def summary(self, report: Dict):
+        counts = report.get("counts", {})
+        self.heading(f"Fact Check Report - {report.get('video_id', 'unknown')}", 18)
+
+        self.paragraph("Total sentences:", str(report.get("total_sentences", 0)))
+        self.paragraph("Factual claims:", str(counts.get("factual_claims", 0)))
+        self.paragraph("Disputed claims:", str(counts.get("disputed_claims", 0)))
+        self.paragraph("Ignored:", str(counts.get("ignored", 0)))
+        self.paragraph("Pre-filtered (not sent to model):", str(counts.get("prefiltered", 0)))
+
+    def claim(self, item: Dict):
+        fc = item.get("fact_check") or {}
+        verdict = str(fc.get("verdict", "UNVERIFIABLE"))
+        x = MARGIN + CARD_INDENT
+
+        # Keep at least the first lines of a card together
+        self._ensure_space(LINE_HEIGHT * 4)
+        self.y -= LINE_HEIGHT / 2
+        self.card = (self.y, VERDICT_COLORS[verdict_css(verdict)])
+
+        self.paragraph("Sentence:", str(item.get("sentence")), "F3", x)
+        self.paragraph("Model score:", str(item.get("model_score")), "F1", x)
+        model = fc.get("model")
+        self.paragraph("Verdict:", f"{verdict} ({model})" if model else verdict, "F1", x)
+        self.paragraph("Explanation:", str(fc.get("explanation")), "F1", x)
+
+        for ev in fc.get("evidence", []) or []:
+            if isinstance(ev, dict):
+                self.paragraph(f"- {ev.get('source')}:", str(ev.get("description")), "F1", x)
+
+        self._bar(self.card[0], self.y - 3, self.card[1])
+        self.card = None
+
+    def close(self):
+        self._flush_page()
+        self.pdf.close()
+
+
+def write_pdf_report(report: Dict, stream: BinaryIO):
+    """
+    Streams the full report as a PDF to a binary stream.
+    """
+    writer = PdfReportWriter(stream)
+    writer.summary(report)
+
+    sections = [
+        ("Factual claims (verified)", report.get("factual_claims_verified", [])),
+        ("Disputed claims (verified)", report.get("disputed_claims_verified", [])),
+    ]
+    for title, items in sections:
+        writer.heading(title)
+        for item in items:
+            writer.claim(item)
+
+    writer.close()
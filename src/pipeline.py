@@ -1,98 +1,244 @@
 # src/pipeline.py
 
+import sys
 import json
+import time
 
-from src.segmenter import get_video_sentences
-from src.model_loader import load_claim_classifier
+from src.segmenter import get_video_transcript, get_video_channel, TranscriptUnavailable
+from src.languages import (
+    DEFAULT_LANGUAGE, get_classifier, classifier_version_for, classifier_language_for
+)
 from src.triage import classify_sentences
-from src.fact_checker import verify_claim
-
-
-def run_pipeline(video_id: str):
-    print(f"\n=== FACT CHECKING VIDEO: {video_id} ===\n")
-
-    # -----------------------------
-    # 1. Load the classifier model
-    # -----------------------------
-    classifier = load_claim_classifier()
-
-    # -----------------------------
-    # 2. Extract transcript sentences
-    # -----------------------------
-    sentences = get_video_sentences(video_id)
-    print(f"Extracted {len(sentences)} sentences")
-
-    # -----------------------------
-    # 3. Classify each sentence
-    # -----------------------------
-    triage_result = classify_sentences(sentences, classifier)
-
-    trusted = triage_result["trusted"]      # factual claims
-    disputed = triage_result["disputed"]    # disputed claims
-    ignored = triage_result["ignored"]      # not claims
-
-    print(f"\nTrusted: {len(trusted)} | Disputed: {len(disputed)} | Ignored: {ignored}\n")
-
-    # -----------------------------
-    # 4. Fact-check ALL factual claims
-    # -----------------------------
-    factual_checked = []
-    for item in trusted:
+from src.prediction_cache import get_prediction_cache
+from src.prefilter import PREFILTER_VERSION
+from src.fact_checker import verify_claim, get_verifier_version
+from src.checkpoint import RunJournal
+from src.archive import build_stage_versions, save_report_record
+from src.claim_store import append_report
+from src.profiling import stage, profile_session
+
+
+def check_claims(items, section: str, journal: RunJournal):
+    """
+    Fact-checks every triaged item, skipping those already in the journal.
+    Each new verdict is journaled as soon as it completes.
+    """
+    checked = []
+    for i, item in enumerate(items):
         sent = item["sentence"]
         score = item["score"]
 
-        print(f"Checking factual claim:\n→ {sent}\n")
-
-        llm_verdict = verify_claim(sent)
-
-        factual_checked.append({
+        llm_verdict = journal.get_verdict(section, i)
+        if llm_verdict is None:
+            print(f"Checking {section} claim:\n→ {sent}\n")
+            start = time.perf_counter()
+            llm_verdict = verify_claim(sent)
+            latency_ms = (time.perf_counter() - start) * 1000
+            # Unchecked claims are retried when the run is resumed
+            if not llm_verdict.get("error"):
+                journal.record_verdict(section, i, llm_verdict, latency_ms)
+        else:
+            print(f"Resumed {section} claim from checkpoint:\n→ {sent}\n")
+            latency_ms = journal.get_latency(section, i)
+
+        checked.append({
             "sentence": sent,
             "model_score": score,
-            "fact_check": llm_verdict
+            "fact_check": llm_verdict,
+            "latency_ms": latency_ms
         })
 
-    # -----------------------------
-    # 5. Fact-check disputed claims
-    # -----------------------------
-    disputed_checked = []
-    for item in disputed:
-        sent = item["sentence"]
-        score = item["score"]
-
-        print(f"Checking disputed claim:\n→ {sent}\n")
+    return checked
 
-        llm_verdict = verify_claim(sent)
 
-        disputed_checked.append({
-            "sentence": sent,
-            "model_score": score,
-            "fact_check": llm_verdict
-        })
-
-    # -----------------------------
-    # 6. Build final structured JSON
-    # -----------------------------
-    report = {
+def build_report(video_id: str, sentences, triage_result, factual_checked, disputed_checked,
+                 stage_versions: dict, language: str = DEFAULT_LANGUAGE):
+    """
+    Assembles the final structured report from the output of every stage.
+    """
+    return {
         "video_id": video_id,
+        "language": language,
+        # Differs from `language` when triage fell back to another model
+        "classifier_language": classifier_language_for(language),
         "total_sentences": len(sentences),
 
         "counts": {
-            "factual_claims": len(trusted),
-            "disputed_claims": len(disputed),
-            "ignored": ignored
+            "factual_claims": len(triage_result["trusted"]),
+            "disputed_claims": len(triage_result["disputed"]),
+            "ignored": triage_result["ignored"],
+            "prefiltered": triage_result.get("prefiltered", 0)
         },
 
         "factual_claims_verified": factual_checked,
         "disputed_claims_verified": disputed_checked,
+
+        "stage_versions": stage_versions,
     }
 
+
+def run_pipeline(video_id: str, resume: bool = True, archive: bool = True):
+    print(f"\n=== FACT CHECKING VIDEO: {video_id} ===\n")
+
+    journal = RunJournal(video_id)
+    if not resume:
+        journal.discard()
+        journal = RunJournal(video_id)
+
+    try:
+        # -----------------------------
+        # 1. Extract transcript sentences
+        # -----------------------------
+        if journal.sentences:
+            sentences = journal.sentences
+            language = journal.language or DEFAULT_LANGUAGE
+            print(f"Resumed {len(sentences)} sentences from checkpoint")
+        else:
+            with stage("transcript"):
+                language, sentences = get_video_transcript(video_id)
+            # A failed fetch must not end up archived over a good transcript:
+            # refresh never downloads captions again
+            if language is None or not sentences:
+                raise TranscriptUnavailable(f"No transcript could be loaded for {video_id}")
+            print(f"Extracted {len(sentences)} sentences (language: {language})")
+            journal.record_transcript(sentences, language)
+
+        # -----------------------------
+        # 2. Classify each sentence with the model for its language
+        #    (model is only loaded if triage has not been checkpointed)
+        # -----------------------------
+        if journal.triage is not None:
+            triage_result = journal.triage
+            classifier_version = (
+                journal.classifier_version or classifier_version_for(language)
+            )
+        else:
+            with stage("model_load"):
+                classifier = get_classifier(language)
+            with stage("triage"):
+                cache = get_prediction_cache()
+                hits, lookups = cache.hits, cache.lookups
+                triage_result = classify_sentences(sentences, classifier, lang=language)
+                print(f"Classifier cache: {cache.hits - hits}/{cache.lookups - lookups} sentences reused")
+            classifier_version = classifier.triage_version
+            journal.record_triage(triage_result, classifier_version)
+            cache.save()    # throttled; the rest is saved at exit
+
+        trusted = triage_result["trusted"]      # factual claims
+        disputed = triage_result["disputed"]    # disputed claims
+        ignored = triage_result["ignored"]      # not claims
+        prefiltered = triage_result.get("prefiltered", 0)  # dropped before the model
+
+        print(f"\nTrusted: {len(trusted)} | Disputed: {len(disputed)} | Ignored: {ignored} (pre-filtered: {prefiltered})\n")
+
+        # -----------------------------
+        # 3. Fact-check ALL factual claims
+        # -----------------------------
+        with stage("verification"):
+            factual_checked = check_claims(trusted, "factual", journal)
+
+        # -----------------------------
+        # 4. Fact-check disputed claims
+        # -----------------------------
+        with stage("verification"):
+            disputed_checked = check_claims(disputed, "disputed", journal)
+
+    except BaseException:
+        # Keep the journal on disk so the next run can resume
+        journal.close()
+        raise
+
+    # -----------------------------
+    # 5. Build final structured JSON
+    # -----------------------------
+    stage_versions = build_stage_versions(
+        sentences,
+        classifier_version=classifier_version,
+        prefilter_version=PREFILTER_VERSION,
+        verifier_version=get_verifier_version(),
+    )
+
+    report = build_report(
+        video_id, sentences, triage_result, factual_checked, disputed_checked, stage_versions,
+        language
+    )
+
+    # Keep a versioned copy so `python -m src.refresh` can update it later,
+    # and append the claims to the columnar store for cross-video queries
+    if archive:
+        with stage("archive"):
+            save_report_record(report, sentences)
+            try:
+                append_report(report, channel=get_video_channel(video_id))
+            except RuntimeError as e:
+                print(f"Claim store not updated: {e}")
+
+    # Run finished: the checkpoint is only needed if some claims were left
+    # unchecked, so the next run resumes and retries just those
+    unchecked = sum(
+        1 for item in factual_checked + disputed_checked if item["fact_check"].get("error")
+    )
+    if unchecked:
+        print(f"{unchecked} claims unchecked, keeping checkpoint {journal.path}")
+        journal.close()
+    else:
+        journal.discard()
+
     return report
 
 
+def run_pipeline_batch(video_ids):
+    """
+    Runs many videos, grouped by caption language so each language's
+    segmenter and classifier are loaded once and stay hot in the LRU.
+    Returns {video_id: report}.
+    """
+    by_language = {}
+    for video_id in video_ids:
+        journal = RunJournal(video_id)
+        if not journal.sentences:
+            # Seed the checkpoint so run_pipeline reuses this transcript
+            language, sentences = get_video_transcript(video_id)
+            if language is None or not sentences:
+                print(f"Skipping {video_id}: no transcript could be loaded")
+                journal.close()
+                continue
+            journal.record_transcript(sentences, language)
+        journal.close()
+
+        by_language.setdefault(journal.language or DEFAULT_LANGUAGE, []).append(video_id)
+
+    reports = {}
+    for language, group in by_language.items():
+        print(f"\n=== LANGUAGE {language}: {len(group)} videos ===")
+        for video_id in group:
+            reports[video_id] = run_pipeline(video_id)
+
+    return reports
+
+
+def print_profile_summary(summary: dict):
+    print(f"\n=== PROFILE ({summary['total_seconds']} s) → {summary['out_dir']} ===")
+    for name, info in summary["stages"].items():
+        print(f"\n[{name}] {info['wall_seconds']} s, components: {info['components']}")
+        for func, samples in info["top_self"][:5]:
+            print(f"  {samples:6d}  {func}")
+
+
 # Standalone test
+#   python -m src.pipeline [VIDEO_ID_OR_PATH] [--profile]
 if __name__ == "__main__":
-    test_id = "Ks-_Mh1QhMc"
-    result = run_pipeline(test_id)
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    test_id = args[0] if args else "Ks-_Mh1QhMc"
+
+    if "--profile" in sys.argv:
+        from src.report_generator import report_path
+
+        with profile_session(report_path(test_id, "profile")) as session:
+            result = run_pipeline(test_id)
+        print_profile_summary(session.summary)
+    else:
+        result = run_pipeline(test_id)
 
     print("\n=== FINAL REPORT ===")
     print(json.dumps(result, indent=4))
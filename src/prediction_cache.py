@@ -0,0 +1,225 @@
+# src/prediction_cache.py
+#
+# Sentence-level cache of classifier outputs, shared across videos.
+#
+# Intros, outros, sponsor reads and catchphrases repeat word for word
+# across a channel's videos; a cache hit skips the transformer entirely.
+#
+# Entries live in flat numpy arrays (15 bytes per entry):
+#   key    uint64   hash of (model tag, normalised sentence); 0 = empty
+#   label  int8     class id (index into the model's id2label)
+#   score  float16  softmax score
+#   stamp  uint32   last use, for LRU eviction
+#
+# The table is set-associative: a key can only live in one bucket of
+# WAYS slots, and the least recently used slot of that bucket is evicted
+# on insert. Lookups of a whole batch are one vectorised numpy gather.
+#
+# With a `path`, the table is loaded from / saved to one .npy file so the
+# cache survives restarts. Only new entries make a save necessary (LRU
+# stamps of hits ride along with the next one), saves are throttled to one
+# per SAVE_INTERVAL, and the shared cache is saved once more at exit.
+
+import os
+import re
+import time
+import atexit
+import hashlib
+import tempfile
+import threading
+import unicodedata
+
+import numpy as np
+
+CACHE_PATH = os.path.join("cache", "predictions.npy")
+CACHE_CAPACITY = 1 << 21      # ~2M entries, ~30 MiB
+WAYS = 8                      # slots per bucket
+SAVE_INTERVAL = 300.0         # seconds between two saves of the table
+
+ENTRY_DTYPE = np.dtype([
+    ("key", np.uint64),
+    ("label", np.int8),
+    ("score", np.float16),
+    ("stamp", np.uint32),
+])
+
+SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_sentence(sentence: str) -> str:
+    """
+    Unicode (NFKC) and whitespace normalisation only. Case and punctuation
+    are kept because the classifier sees them.
+    """
+    return SPACE_RE.sub(" ", unicodedata.normalize("NFKC", sentence)).strip()
+
+
+def sentence_hash(sentence: str, model_tag: str) -> int:
+    h = hashlib.blake2b(digest_size=8)
+    h.update(model_tag.encode("utf-8"))
+    h.update(b"\x00")
+    h.update(normalize_sentence(sentence).encode("utf-8"))
+    return int.from_bytes(h.digest(), "little") or 1    # 0 marks an empty slot
+
+
+class PredictionCache:
+    """
+    Bounded LRU map of (model tag, sentence) → (label id, score).
+    """
+
+    def __init__(self, capacity: int = CACHE_CAPACITY, path: str = None):
+        self.n_buckets = max(1, capacity // WAYS)
+        self.capacity = self.n_buckets * WAYS
+        self.path = path
+
+        self.table = np.zeros((self.n_buckets, WAYS), dtype=ENTRY_DTYPE)
+        self.clock = 0
+        self.dirty = False            # entries added since the last save
+        self._saved_at = time.monotonic()
+        self._save_lock = threading.Lock()
+
+        self.lookups = 0
+        self.hits = 0
+
+        if path and os.path.exists(path):
+            self._load(path)
+
+    # -----------------------------
+    # Lookup / insert
+    # -----------------------------
+    def _buckets(self, keys):
+        return (keys % np.uint64(self.n_buckets)).astype(np.int64)
+
+    def _tick(self, n: int = 1) -> int:
+        self.clock += n
+        if self.clock >= np.iinfo(np.uint32).max:
+            self._rescale_stamps()
+        return self.clock
+
+    def _rescale_stamps(self):
+        # Keep relative LRU order when the 32-bit clock would overflow
+        stamps = self.table["stamp"]
+        order = np.argsort(stamps, axis=None, kind="stable")
+        ranks = np.empty(order.size, dtype=np.uint32)
+        ranks[order] = np.arange(order.size, dtype=np.uint32)
+        self.table["stamp"] = ranks.reshape(stamps.shape)
+        self.clock = int(order.size)
+
+    def get_many(self, keys):
+        """
+        keys: array of uint64 hashes. Returns (found mask, label ids, scores).
+        """
+        keys = np.asarray(keys, dtype=np.uint64)
+        buckets = self._buckets(keys)
+        rows = self.table[buckets]                       # [n, WAYS]
+
+        match = rows["key"] == keys[:, None]
+        found = match.any(axis=1)
+        way = match.argmax(axis=1)
+
+        hit_idx = np.nonzero(found)[0]
+        if len(hit_idx):
+            # Not worth a save on its own
+            self.table["stamp"][buckets[hit_idx], way[hit_idx]] = self._tick()
+
+        self.lookups += len(keys)
+        self.hits += int(found.sum())
+
+        picked = rows[np.arange(len(keys)), way]
+        return found, picked["label"], picked["score"]
+
+    def put(self, key: int, label_id: int, score: float):
+        bucket = int(key % self.n_buckets)
+        row = self.table[bucket]
+
+        same = np.nonzero(row["key"] == key)[0]
+        # Empty slots have stamp 0, so argmin fills them before evicting
+        way = int(same[0]) if len(same) else int(row["stamp"].argmin())
+
+        row[way] = (key, label_id, score, self._tick())
+        self.dirty = True
+
+    # -----------------------------
+    # Stats
+    # -----------------------------
+    def __len__(self):
+        return int(np.count_nonzero(self.table["key"]))
+
+    def stats(self) -> dict:
+        return {
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_rate": round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+            "entries": len(self),
+            "capacity": self.capacity,
+            "bytes": self.table.nbytes,
+        }
+
+    # -----------------------------
+    # Disk persistence
+    # -----------------------------
+    def _load(self, path: str):
+        try:
+            table = np.load(path, allow_pickle=False)
+        except (OSError, ValueError) as e:
+            print(f"[prediction_cache] Ignoring unreadable cache {path}: {e}")
+            return
+
+        if table.dtype != ENTRY_DTYPE or table.shape != self.table.shape:
+            print(f"[prediction_cache] Cache size changed, starting empty: {path}")
+            return
+
+        self.table = table
+        self.clock = int(table["stamp"].max())
+
+    def save(self, path: str = None, force: bool = False):
+        """
+        Atomically writes the table if entries were added since the last
+        save, at most once per SAVE_INTERVAL unless `force` is set.
+        Returns the path written, or None.
+        """
+        path = path or self.path
+        if not path or not self.dirty:
+            return None
+
+        with self._save_lock:
+            if not self.dirty or (not force and time.monotonic() - self._saved_at < SAVE_INTERVAL):
+                return None
+
+            # Snapshot first: other threads keep inserting while it is written
+            self.dirty = False
+            table = self.table.copy()
+
+            folder = os.path.dirname(path) or "."
+            tmp_path = None
+            try:
+                os.makedirs(folder, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(
+                    dir=folder, prefix=os.path.basename(path) + ".", suffix=".tmp"
+                )
+                with os.fdopen(fd, "wb") as f:
+                    np.save(f, table, allow_pickle=False)
+                os.chmod(tmp_path, 0o644)     # mkstemp creates it 0600
+                os.replace(tmp_path, path)
+            except OSError as e:
+                # Only a cache: keep the entries for the next attempt
+                print(f"[prediction_cache] Could not save {path}: {e}")
+                self.dirty = True
+                if tmp_path and os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                return None
+
+            self._saved_at = time.monotonic()
+            return path
+
+
+_shared = None
+
+
+def get_prediction_cache() -> PredictionCache:
+    """Process-wide cache shared by every loaded classifier."""
+    global _shared
+    if _shared is None:
+        _shared = PredictionCache(path=CACHE_PATH)
+        atexit.register(_shared.save, force=True)
+    return _shared
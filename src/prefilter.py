@@ -0,0 +1,146 @@
+# src/prefilter.py
+
+import re
+
+try:
+    from src.languages import DEFAULT_LANGUAGE
+except ImportError:
+    from languages import DEFAULT_LANGUAGE
+
+# ---------------------------------------------------
+# Cheap lexical pre-filter run before the transformer
+# ---------------------------------------------------
+#
+# Every rule here is deliberately conservative: a sentence is only dropped
+# when it is obviously not a claim. Anything borderline goes through to the
+# classifier. Recall on evaluate_classifier.TEST_DATA is checked by
+# `measure_recall` (see `python evaluate_classifier.py --prefilter`).
+
+# Bump whenever the rules below change (stored reports are re-triaged)
+PREFILTER_VERSION = "4"
+
+# Shorter fragments are dropped outright. Two words can already be a
+# claim ("Vaccines work."), so those only go if they are filler.
+MIN_WORDS = 2
+
+# Languages the filler / opinion patterns below are written for. Every
+# other language only gets the short-fragment rule.
+RULE_LANGUAGES = ("en",)
+
+# Written without spaces between words: one "word" can be a whole clause,
+# so not even the short-fragment rule applies
+UNSPACED_LANGUAGES = ("zh", "ja", "th", "lo", "km", "my", "bo")
+
+# Whole-sentence filler / greeting / outro patterns
+FILLER_PATTERNS = [
+    r"(so\s+)?(yeah|yes|no|okay|ok|um+|uh+|hmm+|right|alright|well|wow|oh|cool|nice|great)([\s,]+(yeah|so|okay|ok|um+|uh+|right|guys))*",
+    r"((hey|hi|hello)(\s+(guys|everyone|everybody|there|folks|friends))?[\s,!.]*)?"
+    r"(and\s+)?(welcome(\s+back)?(\s+to\s+(the|my|our|this)\s+(channel|video))?(\s+(guys|everyone|everybody))?)?",
+    r"(thank you|thanks)(\s+(so|very)\s+much)?(\s+(guys|everyone|all))?(\s+for\s+(watching|listening|tuning in|joining))?",
+    r"(please\s+|don'?t\s+forget\s+to\s+)?(like|subscribe|hit the bell|smash that like button)"
+    r"(\s+(and|the|this|video|subscribe|channel|to|my|our|button|bell|notification))*",
+    r"(see you|see ya|bye|goodbye|peace out)(\s+(guys|everyone|next time|soon|in the next (one|video)))*",
+    r"(let'?s|let us)\s+(get started|get into it|dive in|begin|go)",
+    r"(\[?(music|applause|laughter)\]?)",
+]
+FILLER_RE = re.compile(
+    r"^\W*(?:" + "|".join(FILLER_PATTERNS) + r")\W*$", re.IGNORECASE
+)
+
+# Whole-sentence first-person opinions about the video / speaker / audience
+# ("I love this video", "we hope you enjoyed it"). The object must end the
+# sentence: any complement ("I feel like ...", "I love that ...",
+# "we hate how ...") can carry a hedged claim and goes to the classifier.
+OPINION_OBJECTS = (
+    r"(it|this|that|these|those|you|you guys|y'all|him|her|them|everyone|"
+    r"(this|that|the|your|my|our)\s+(video|channel|one|part|episode|song|intro|guy|guys|stuff))"
+)
+OPINION_RE = re.compile(
+    r"^\W*(honestly,?\s+)?(i|we)\s+(really\s+|just\s+|absolutely\s+)?"
+    r"(?:(love|like|hate|enjoy|enjoyed|adore|appreciate|can't wait for|cannot wait for)\s+" + OPINION_OBJECTS +
+    r"|(hope|wish)\s+(you|you guys|everyone)\s+(enjoy|enjoyed|like|liked|love|loved)\s+" + OPINION_OBJECTS +
+    r")(\s+(so much|a lot|very much|too|guys|everyone))*\W*$",
+    re.IGNORECASE,
+)
+
+# Any digit or spelled-out quantity counts as a "number"
+NUMBER_RE = re.compile(
+    r"\d|\b(one|two|three|four|five|six|seven|eight|nine|ten|hundred|thousand|"
+    r"million|billion|trillion|percent|half|twice|dozen)\b",
+    re.IGNORECASE,
+)
+
+# Letters / digits in any script; "don't" and "l'alunissage" are one word
+WORD_RE = re.compile(r"[^\W_]+(?:'[^\W_]+)*")
+
+
+def has_entity_or_number(sentence: str) -> bool:
+    """
+    Cheap stand-in for NER: any number, or a capitalised word that is not
+    the first word (and not the pronoun "I").
+    """
+    if NUMBER_RE.search(sentence):
+        return True
+
+    words = WORD_RE.findall(sentence)
+    for w in words[1:]:
+        if w[0].isupper() and w != "I" and not w.startswith("I'"):
+            return True
+
+    return False
+
+
+def is_obvious_non_claim(sentence: str, lang: str = DEFAULT_LANGUAGE) -> bool:
+    """
+    Returns True if the sentence can be dropped without running the model.
+    """
+    text = sentence.strip()
+    words = WORD_RE.findall(text)
+
+    # Empty, or one-word fragments ("okay.", "yeah")
+    if not words or (lang not in UNSPACED_LANGUAGES and len(words) < MIN_WORDS):
+        return True
+
+    if lang not in RULE_LANGUAGES:
+        return False
+
+    # Greetings, outros, filler ("so yeah", "thanks for watching")
+    if FILLER_RE.match(text):
+        return True
+
+    # Pure opinion about the video itself, with nothing checkable in it
+    if OPINION_RE.match(text) and not has_entity_or_number(text):
+        return True
+
+    return False
+
+
+def prefilter_sentences(sentences, lang: str = DEFAULT_LANGUAGE):
+    """
+    Splits sentences into (kept, dropped_count).
+    """
+    kept = []
+    dropped = 0
+
+    for sent in sentences:
+        if is_obvious_non_claim(sent, lang):
+            dropped += 1
+        else:
+            kept.append(sent)
+
+    return kept, dropped
+
+
+# ---------------------------------------------------
+# Recall guard
+# ---------------------------------------------------
+def measure_recall(test_data, lang: str = DEFAULT_LANGUAGE):
+    """
+    Fraction of labelled claims (FACTUAL_CLAIM / DISPUTED_CLAIM) in
+    `test_data` that survive the pre-filter, plus the claims it dropped.
+    """
+    claims = [text for text, label in test_data if label != "NOT_A_CLAIM"]
+    lost = [text for text in claims if is_obvious_non_claim(text, lang)]
+
+    recall = 1.0 if not claims else (len(claims) - len(lost)) / len(claims)
+    return recall, lost
@@ -0,0 +1,244 @@
+# src/profiling.py
+#
+# Opt-in per-run profiling.
+#
+#   with profile_session(report_path("X", "profile")) as session:
+#       report = run_pipeline(video_id)
+#   session.summary   # top hot functions per stage
+#
+# Writes into the output folder:
+#   samples.folded   sampled stacks, "stage;frame;frame;... count"
+#                    (flamegraph.pl / speedscope / inferno compatible)
+#   summary.json     per-stage wall time, component split, hot functions
+#   torch_ops.txt    torch operator table (if torch is installed)
+#   torch_trace.json chrome://tracing timeline of torch ops
+#
+# When no session is active, `stage()` only records the current stage
+# name for the thread, so the pipeline can call it unconditionally.
+#
+# torch.profiler is process-global, so only one session runs at a time:
+# a second one waits for it, or raises ProfilerBusy with wait=False.
+
+import os
+import sys
+import json
+import time
+import threading
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+SAMPLE_INTERVAL = 0.005   # seconds between stack samples
+MAX_STACK_DEPTH = 64
+TOP_FUNCTIONS = 15
+
+# Frame file paths → component, checked from the innermost frame outwards
+COMPONENTS = [
+    ("spacy", ("spacy", "thinc")),
+    ("tokenization", ("tokenizers", "tokenization_")),
+    ("torch", ("torch",)),
+    ("subprocess", ("subprocess.py", "selectors.py")),
+    ("transformers", ("transformers",)),
+]
+
+# thread id → current stage name / active session
+_stages = {}
+_sessions = {}
+
+# Held for the whole lifetime of a session
+_session_lock = threading.Lock()
+
+
+class ProfilerBusy(RuntimeError):
+    """Another profiling session is already running in this process."""
+
+
+# ---------------------------------------------------
+# Stage markers
+# ---------------------------------------------------
+@contextmanager
+def stage(name: str):
+    """
+    Marks a pipeline stage for the current thread. Cheap when no
+    profiling session is active.
+    """
+    tid = threading.get_ident()
+    previous = _stages.get(tid)
+    _stages[tid] = name
+
+    session = _sessions.get(tid)
+    start = time.perf_counter() if session else None
+    try:
+        yield
+    finally:
+        if session:
+            session.stage_seconds[name] += time.perf_counter() - start
+        if previous is None:
+            _stages.pop(tid, None)
+        else:
+            _stages[tid] = previous
+
+
+# ---------------------------------------------------
+# Sampling profiler
+# ---------------------------------------------------
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _component(frames) -> str:
+    for frame in frames:
+        path = frame.f_code.co_filename
+        for component, markers in COMPONENTS:
+            if any(marker in path for marker in markers):
+                return component
+    return "python"
+
+
+class SamplingProfiler:
+    """
+    Samples one thread's Python stack from a background thread.
+    """
+
+    def __init__(self, thread_id: int, interval: float = SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()           # (stage, stack tuple) → samples
+        self.components = defaultdict(Counter)   # stage → component → samples
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+
+            frames = []
+            while frame is not None and len(frames) < MAX_STACK_DEPTH:
+                frames.append(frame)
+                frame = frame.f_back
+
+            current = _stages.get(self.thread_id, "other")
+            self.stacks[(current, tuple(_frame_name(f) for f in reversed(frames)))] += 1
+            self.components[current][_component(frames)] += 1
+
+
+# ---------------------------------------------------
+# Profiling session
+# ---------------------------------------------------
+class ProfileSession:
+    def __init__(self, out_dir: str, interval: float = SAMPLE_INTERVAL, torch_ops: bool = True,
+                 wait: bool = True):
+        self.out_dir = out_dir
+        self.wait = wait
+        self.thread_id = threading.get_ident()
+        self.sampler = SamplingProfiler(self.thread_id, interval)
+        self.stage_seconds = defaultdict(float)
+        self.summary = None
+
+        self._torch_prof = None
+        if torch_ops:
+            try:
+                from torch.profiler import profile, ProfilerActivity
+                self._torch_prof = profile(activities=[ProfilerActivity.CPU])
+            except ImportError:
+                pass
+
+    def __enter__(self):
+        if not _session_lock.acquire(blocking=self.wait):
+            raise ProfilerBusy("another profiling session is running")
+        try:
+            if self._torch_prof is not None:
+                self._torch_prof.__enter__()
+        except BaseException:
+            _session_lock.release()
+            raise
+
+        _sessions[self.thread_id] = self
+        self._start = time.perf_counter()
+        self.sampler.start()
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            self.sampler.stop()
+            total = time.perf_counter() - self._start
+            _sessions.pop(self.thread_id, None)
+            if self._torch_prof is not None:
+                self._torch_prof.__exit__(*exc)
+
+            os.makedirs(self.out_dir, exist_ok=True)
+            self._write_folded()
+            self._write_torch()
+            self.summary = self._build_summary(total)
+
+            with open(os.path.join(self.out_dir, "summary.json"), "w", encoding="utf-8") as f:
+                json.dump(self.summary, f, indent=2)
+        finally:
+            # The torch profiler's results are read above, so release last
+            _session_lock.release()
+
+        return False
+
+    # -----------------------------
+    # Outputs
+    # -----------------------------
+    def _write_folded(self):
+        with open(os.path.join(self.out_dir, "samples.folded"), "w", encoding="utf-8") as f:
+            for (stage_name, stack), count in self.sampler.stacks.most_common():
+                f.write(";".join((stage_name,) + stack) + f" {count}\n")
+
+    def _write_torch(self):
+        if self._torch_prof is None:
+            return
+
+        table = self._torch_prof.key_averages().table(sort_by="self_cpu_time_total", row_limit=30)
+        with open(os.path.join(self.out_dir, "torch_ops.txt"), "w", encoding="utf-8") as f:
+            f.write(table)
+
+        self._torch_prof.export_chrome_trace(os.path.join(self.out_dir, "torch_trace.json"))
+
+    def _build_summary(self, total_seconds: float) -> dict:
+        self_samples = defaultdict(Counter)
+        inclusive_samples = defaultdict(Counter)
+        stage_samples = Counter()
+
+        for (stage_name, stack), count in self.sampler.stacks.items():
+            stage_samples[stage_name] += count
+            if stack:
+                self_samples[stage_name][stack[-1]] += count
+            for name in set(stack):
+                inclusive_samples[stage_name][name] += count
+
+        stages = {}
+        for stage_name, samples in stage_samples.most_common():
+            stages[stage_name] = {
+                "wall_seconds": round(self.stage_seconds.get(stage_name, 0.0), 3),
+                "samples": samples,
+                "components": dict(self.sampler.components[stage_name].most_common()),
+                "top_self": self_samples[stage_name].most_common(TOP_FUNCTIONS),
+                "top_inclusive": inclusive_samples[stage_name].most_common(TOP_FUNCTIONS),
+            }
+
+        return {
+            "out_dir": self.out_dir,
+            "total_seconds": round(total_seconds, 3),
+            "sample_interval": self.sampler.interval,
+            "stages": stages,
+        }
+
+
+@contextmanager
+def profile_session(out_dir: str, interval: float = SAMPLE_INTERVAL, torch_ops: bool = True,
+                    wait: bool = True):
+    session = ProfileSession(out_dir, interval, torch_ops, wait)
+    with session:
+        yield session
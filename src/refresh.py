@@ -0,0 +1,224 @@
+# src/refresh.py
+#
+# Incremental re-check of stored reports.
+#
+#   python -m src.refresh                 # refresh every stale report
+#   python -m src.refresh --dry-run       # only list what would change
+#   python -m src.refresh --html          # also re-render reports/report_<id>.html
+#
+# Only stages whose recorded input versions differ from the current ones
+# are recomputed. Transcripts are never re-downloaded, and a verdict is
+# reused whenever the same sentence was already checked by the current
+# LLM + prompt version (and came from the primary model, not a fallback).
+
+import os
+import time
+import argparse
+
+from src.archive import (
+    ARCHIVE_DIR, iter_archive, save_report_record, build_stage_versions, transcript_hash
+)
+from src.languages import DEFAULT_LANGUAGE, get_classifier, classifier_version_for
+from src.prefilter import PREFILTER_VERSION
+from src.triage import classify_sentences
+from src.prediction_cache import get_prediction_cache
+from src.fact_checker import verify_claim, get_verifier_version, is_final_verdict
+from src.pipeline import build_report
+from src.claim_store import append_report
+from src.segmenter import get_video_channel
+from src.report_generator import REPORTS_DIR, save_html_report, report_path
+
+
+# ---------------------------------------------------
+# Staleness detection
+# ---------------------------------------------------
+def record_language(record: dict) -> str:
+    return record["report"].get("language") or DEFAULT_LANGUAGE
+
+
+def current_versions(sentences, language: str = DEFAULT_LANGUAGE) -> dict:
+    return build_stage_versions(
+        sentences,
+        classifier_version=classifier_version_for(language),
+        prefilter_version=PREFILTER_VERSION,
+        verifier_version=get_verifier_version(),
+    )
+
+
+def stale_stages(record: dict) -> list:
+    """
+    Returns the names of report stages whose inputs changed.
+    Reports written before versions were recorded count as fully stale.
+    """
+    recorded = record["report"].get("stage_versions", {})
+    current = current_versions(record["sentences"], record_language(record))
+
+    stale = [
+        stage for stage in ("triage", "verification")
+        if recorded.get(stage) != current[stage]
+    ]
+
+    # Verdicts left over from an LLM outage / fallback model
+    if "verification" not in stale and not all(
+        is_final_verdict(item.get("fact_check") or {})
+        for key in ("factual_claims_verified", "disputed_claims_verified")
+        for item in record["report"].get(key, [])
+    ):
+        stale.append("verification")
+
+    return stale
+
+
+# ---------------------------------------------------
+# Recompute one stored report
+# ---------------------------------------------------
+def reusable_verdicts(report: dict, verifier_unchanged: bool) -> dict:
+    """
+    Maps sentence → previous checked item, if its verdict is still valid.
+    Verdicts from a fallback model, or claims left unchecked, are redone.
+    """
+    if not verifier_unchanged:
+        return {}
+
+    previous = {}
+    for key in ("factual_claims_verified", "disputed_claims_verified"):
+        for item in report.get(key, []):
+            if is_final_verdict(item.get("fact_check") or {}):
+                previous[item["sentence"]] = item
+    return previous
+
+
+def recheck(items, previous: dict):
+    checked = []
+    reused = 0
+
+    for item in items:
+        sent = item["sentence"]
+
+        if sent in previous:
+            llm_verdict = previous[sent]["fact_check"]
+            latency_ms = previous[sent].get("latency_ms")
+            reused += 1
+        else:
+            print(f"Re-checking claim:\n→ {sent}\n")
+            start = time.perf_counter()
+            llm_verdict = verify_claim(sent)
+            latency_ms = (time.perf_counter() - start) * 1000
+
+        checked.append({
+            "sentence": sent,
+            "model_score": item["score"],
+            "fact_check": llm_verdict,
+            "latency_ms": latency_ms
+        })
+
+    return checked, reused
+
+
+def triage_from_report(report: dict) -> dict:
+    """Rebuilds the triage result stored inside an existing report."""
+    counts = report.get("counts", {})
+    return {
+        "trusted": [
+            {"sentence": i["sentence"], "score": i["model_score"]}
+            for i in report.get("factual_claims_verified", [])
+        ],
+        "disputed": [
+            {"sentence": i["sentence"], "score": i["model_score"]}
+            for i in report.get("disputed_claims_verified", [])
+        ],
+        "ignored": counts.get("ignored", 0),
+        "prefiltered": counts.get("prefiltered", 0),
+    }
+
+
+def refresh_record(record: dict, stages: list) -> dict:
+    report = record["report"]
+    sentences = record["sentences"]
+    language = record_language(record)
+
+    # Triage: rerun only if the transcript, classifier or pre-filter changed
+    # (classifiers come from the per-language LRU, loaded at most once each)
+    if "triage" in stages:
+        triage_result = classify_sentences(sentences, get_classifier(language), lang=language)
+    else:
+        triage_result = triage_from_report(report)
+
+    # Verification: reuse every verdict still valid for the current LLM + prompt
+    versions = current_versions(sentences, language)
+    verifier_unchanged = (
+        report.get("stage_versions", {}).get("verification") == versions["verification"]
+    )
+    previous = reusable_verdicts(report, verifier_unchanged)
+    factual_checked, reused_f = recheck(triage_result["trusted"], previous)
+    disputed_checked, reused_d = recheck(triage_result["disputed"], previous)
+
+    print(f"Reused {reused_f + reused_d} verdicts")
+
+    return build_report(
+        report["video_id"], sentences, triage_result,
+        factual_checked, disputed_checked, versions, language
+    )
+
+
+# ---------------------------------------------------
+# Refresh the whole archive
+# ---------------------------------------------------
+def refresh_archive(archive_dir: str = ARCHIVE_DIR, dry_run: bool = False,
+                    render_html: bool = False):
+    """
+    Brings every stored report up to date with the current classifier,
+    pre-filter and verification prompt. Returns {path: stale stages}.
+    """
+    summary = {}
+    for path, record in iter_archive(archive_dir):
+        stages = stale_stages(record)
+        summary[path] = stages
+
+        if not stages:
+            continue
+
+        video_id = record["report"]["video_id"]
+        print(f"[refresh] {video_id}: stale stages = {stages}")
+
+        if dry_run:
+            continue
+
+        # The stored transcript must still match what triage was run on
+        t_hash = record["report"].get("stage_versions", {}).get("transcript", {}).get("transcript_hash")
+        if t_hash and t_hash != transcript_hash(record["sentences"]):
+            print(f"[refresh] {video_id}: stored transcript is corrupt, skipping")
+            continue
+
+        report = refresh_record(record, stages)
+        save_report_record(report, record["sentences"], archive_dir)
+
+        # New run in the claim store; analytics only count the latest one
+        try:
+            append_report(report, channel=get_video_channel(video_id))
+        except RuntimeError as e:
+            print(f"[refresh] claim store not updated: {e}")
+
+        if render_html:
+            os.makedirs(REPORTS_DIR, exist_ok=True)
+            save_html_report(report, report_path(video_id, "html"))
+
+    cache = get_prediction_cache()
+    if cache.lookups:
+        print(f"[refresh] classifier cache: {cache.stats()}")
+        cache.save(force=True)
+
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute stale stages of stored reports.")
+    parser.add_argument("--archive", default=ARCHIVE_DIR, help="archive folder to refresh")
+    parser.add_argument("--dry-run", action="store_true", help="only list stale reports")
+    parser.add_argument("--html", action="store_true", help="re-render HTML reports")
+    args = parser.parse_args()
+
+    result = refresh_archive(args.archive, dry_run=args.dry_run, render_html=args.html)
+
+    stale = sum(1 for stages in result.values() if stages)
+    print(f"\n{stale}/{len(result)} stored reports were stale")
@@ -1,9 +1,11 @@
 # src/report_generator.py
 
+import io
 import os
 import re
 import json
-from typing import Dict
+from html import escape
+from typing import Dict, TextIO
 from datetime import datetime
 
 
@@ -30,141 +32,250 @@ def make_safe_filename(name: str) -> str:
     return name
 
 
+REPORTS_DIR = "reports"
+
+
+def report_path(video_input: str, ext: str, reports_dir: str = REPORTS_DIR) -> str:
+    """reports/report_<safe id>.<ext> — only the video part is sanitised."""
+    return os.path.join(reports_dir, f"report_{make_safe_filename(video_input)}.{ext}")
+
+
+def _safe_output_path(out_path: str) -> str:
+    # Sanitise the file name only; the folder is the caller's choice
+    folder, name = os.path.split(out_path)
+    return os.path.join(folder, make_safe_filename(name))
+
+
 # ---------------------------------------
-# HTML RENDERING
+# HTML TEMPLATES (compiled once at import)
 # ---------------------------------------
-def render_html_report(report: Dict) -> str:
+HTML_HEAD = """<html>
+<head>
+  <meta charset="utf-8"/>
+  <title>Fact Check Report - {video_id}</title>
+  <style>
+    body{{font-family: Arial, sans-serif; margin:20px;}}
+    .page{{display:flex; flex-direction:column;}}
+    .summary{{margin-bottom:20px; order:-1;}}
+    .card{{border-radius:8px;padding:12px;margin-bottom:10px;box-shadow: 0 1px 3px rgba(0,0,0,0.08);}}
+    .true{{border-left:6px solid #22c55e}}
+    .false{{border-left:6px solid #ef4444}}
+    .partial{{border-left:6px solid #f59e0b}}
+    .unv{{border-left:6px solid #94a3b8}}
+    pre{{white-space:pre-wrap;}}
+    h2{{margin-top:24px;}}
+  </style>
+</head>
+<body>
+  <h1>Fact Check Report — {video_id}</h1>
+  <div class="page">
+"""
+
+# write_html_report puts the summary first. HtmlReportWriter fed verdict
+# by verdict can only write it last (counts are final once every verdict
+# is in); CSS `order` then moves it to the top of the page.
+HTML_SUMMARY = """    <div class="summary card">
+      <p><strong>Total sentences:</strong> {total}</p>
+      <p><strong>Factual claims:</strong> {factual}</p>
+      <p><strong>Disputed claims:</strong> {disputed}</p>
+      <p><strong>Ignored:</strong> {ignored}</p>
+      <p><strong>Pre-filtered (not sent to model):</strong> {prefiltered}</p>
+    </div>
+"""
+
+HTML_SECTION = """    <h2>{title}</h2>
+"""
+
+HTML_CARD = """    <div class="card {css}">
+      <p><strong>Sentence:</strong> <em>{sentence}</em></p>
+      <p><strong>Model score:</strong> {score}</p>
+      <p><strong>Verdict:</strong> {verdict}</p>
+      <p><strong>Explanation:</strong> {explanation}</p>
+      <p><strong>Evidence:</strong></p>
+      <ul>{evidence}</ul>
+    </div>
+"""
+HTML_EVIDENCE = "<li><strong>{source}</strong>: {description}</li>"
+
+HTML_TAIL = """  </div>
+</body></html>
+"""
+
+# Number of rendered chunks buffered before each write to the stream
+WRITE_BATCH = 256
+
+
+def esc(value) -> str:
+    # Every escaped value is element text (never an attribute), so quotes
+    # can stay as they are.
+    if not isinstance(value, str):
+        value = str(value)
+    return escape(value, quote=False)
+
+
+VERDICT_CSS = {"TRUE": "true", "FALSE": "false"}
+
+
+def verdict_css(verdict: str) -> str:
+    return VERDICT_CSS.get(verdict) or ("partial" if "PARTIAL" in verdict else "unv")
+
+
+def render_claim_card(item: Dict) -> str:
     """
-    Returns HTML string of the report.
+    Renders one verified claim. Shared by the factual and disputed sections.
+    """
+    fc = item.get("fact_check") or {}
+    verdict = str(fc.get("verdict", "UNVERIFIABLE"))
+    css = verdict_css(verdict)
+
+    # Name the LLM that produced the verdict
+    model = fc.get("model")
+    if model:
+        verdict = f"{verdict} ({model})"
+
+    evidence = "".join([
+        HTML_EVIDENCE.format(source=esc(ev.get("source")), description=esc(ev.get("description")))
+        for ev in fc.get("evidence") or ()
+        if isinstance(ev, dict)
+    ])
+
+    return HTML_CARD.format(
+        css=css,
+        sentence=esc(item.get("sentence")),
+        score=esc(item.get("model_score")),
+        verdict=esc(verdict),
+        explanation=esc(fc.get("explanation")),
+        evidence=evidence,
+    )
+
+
+# ---------------------------------------
+# STREAMING HTML WRITER
+# ---------------------------------------
+class HtmlReportWriter:
+    """
+    Writes an HTML report to any text stream in chunks.
+
+    With the finished report at hand, write the summary first:
+
+        writer.write_summary(report)
+        ...
+        writer.close()
+
+    Or feed it incrementally as verdicts arrive, and the summary is
+    written at the end (shown at the top with CSS):
+
+        writer = HtmlReportWriter(fh, video_id)
+        writer.start_section("Factual claims (verified)")
+        writer.write_claim(item)      # once per verdict
+        ...
+        writer.close(report)          # summary + closing tags
     """
 
-    video_id = report.get("video_id", "unknown")
-    total = report.get("total_sentences", 0)
-    counts = report.get("counts", {})
-    factual = report.get("factual_claims_verified", [])
-    disputed = report.get("disputed_claims_verified", [])
-
-    html = f"""
-    <html>
-    <head>
-      <meta charset="utf-8"/>
-      <title>Fact Check Report - {video_id}</title>
-      <style>
-        body{{font-family: Arial, sans-serif; margin:20px;}}
-        .summary{{margin-bottom:20px;}}
-        .card{{border-radius:8px;padding:12px;margin-bottom:10px;box-shadow: 0 1px 3px rgba(0,0,0,0.08);}}
-        .true{{border-left:6px solid #22c55e}}
-        .false{{border-left:6px solid #ef4444}}
-        .partial{{border-left:6px solid #f59e0b}}
-        .unv{{border-left:6px solid #94a3b8}}
-        pre{{white-space:pre-wrap;}}
-        h2{{margin-top:24px;}}
-      </style>
-    </head>
-    <body>
-      <h1>Fact Check Report — {video_id}</h1>
-      <div class="summary card">
-        <p><strong>Total sentences:</strong> {total}</p>
-        <p><strong>Factual claims:</strong> {counts.get('factual_claims', 0)}</p>
-        <p><strong>Disputed claims:</strong> {counts.get('disputed_claims', 0)}</p>
-        <p><strong>Ignored:</strong> {counts.get('ignored', 0)}</p>
-      </div>
+    def __init__(self, stream: TextIO, video_id: str):
+        self.stream = stream
+        self._buffer = []
+        self._summary_written = False
+        self._emit(HTML_HEAD.format(video_id=esc(video_id)))
+
+    def _emit(self, chunk: str):
+        self._buffer.append(chunk)
+        if len(self._buffer) >= WRITE_BATCH:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self.stream.write("".join(self._buffer))
+            self._buffer.clear()
+
+    def start_section(self, title: str):
+        self._emit(HTML_SECTION.format(title=esc(title)))
+
+    def write_claim(self, item: Dict):
+        self._emit(render_claim_card(item))
+
+    def write_claims(self, items):
+        # Bulk path: fills the buffer directly, one flush per WRITE_BATCH cards
+        buffer = self._buffer
+        for item in items:
+            buffer.append(render_claim_card(item))
+            if len(buffer) >= WRITE_BATCH:
+                self.flush()
+
+    def write_summary(self, report: Dict):
+        counts = report.get("counts", {})
+        self._emit(HTML_SUMMARY.format(
+            total=esc(report.get("total_sentences", 0)),
+            factual=esc(counts.get("factual_claims", 0)),
+            disputed=esc(counts.get("disputed_claims", 0)),
+            ignored=esc(counts.get("ignored", 0)),
+            prefiltered=esc(counts.get("prefiltered", 0)),
+        ))
+        self._summary_written = True
+
+    def close(self, report: Dict = None):
+        if report is not None and not self._summary_written:
+            self.write_summary(report)
+        self._emit(HTML_TAIL)
+        self.flush()
+
+
+def write_html_report(report: Dict, stream: TextIO):
     """
+    Streams a complete report to `stream`.
+    """
+    writer = HtmlReportWriter(stream, report.get("video_id", "unknown"))
+    # Counts are known up front: summary first, also for non-CSS readers
+    writer.write_summary(report)
+
+    sections = [
+        ("Factual claims (verified)", report.get("factual_claims_verified", [])),
+        ("Disputed claims (verified)", report.get("disputed_claims_verified", [])),
+    ]
+    for title, items in sections:
+        writer.start_section(title)
+        writer.write_claims(items)
 
-    # ------------------------------
-    # FACTUAL CLAIMS
-    # ------------------------------
-    html += "<h2>Factual claims (verified)</h2>\n"
-    for item in factual:
-        fc = item.get("fact_check", {})
-        verdict = fc.get("verdict", "UNVERIFIABLE")
-
-        # assign CSS class
-        css = "unv"
-        if verdict == "TRUE": css = "true"
-        elif verdict == "FALSE": css = "false"
-        elif "PARTIAL" in verdict: css = "partial"
-
-        # Evidence HTML
-        evidence_html = "".join(
-            f"<li><strong>{ev.get('source')}</strong>: {ev.get('description')}</li>"
-            for ev in fc.get("evidence", [])
-        )
-
-        html += f"""
-        <div class="card {css}">
-          <p><strong>Sentence:</strong> <em>{item.get('sentence')}</em></p>
-          <p><strong>Model score:</strong> {item.get('model_score')}</p>
-          <p><strong>Verdict:</strong> {verdict}</p>
-          <p><strong>Explanation:</strong> {fc.get('explanation')}</p>
-          <p><strong>Evidence:</strong></p>
-          <ul>{evidence_html}</ul>
-        </div>
-        """
-
-    # ------------------------------
-    # DISPUTED CLAIMS
-    # ------------------------------
-    html += "<h2>Disputed claims (verified)</h2>\n"
-    for item in disputed:
-        fc = item.get("fact_check", {})
-        verdict = fc.get("verdict", "UNVERIFIABLE")
-
-        css = "unv"
-        if verdict == "TRUE": css = "true"
-        elif verdict == "FALSE": css = "false"
-        elif "PARTIAL" in verdict: css = "partial"
-
-        evidence_html = "".join(
-            f"<li><strong>{ev.get('source')}</strong>: {ev.get('description')}</li>"
-            for ev in fc.get("evidence", [])
-        )
-
-        html += f"""
-        <div class="card {css}">
-          <p><strong>Sentence:</strong> <em>{item.get('sentence')}</em></p>
-          <p><strong>Model score:</strong> {item.get('model_score')}</p>
-          <p><strong>Verdict:</strong> {verdict}</p>
-          <p><strong>Explanation:</strong> {fc.get('explanation')}</p>
-          <ul>{evidence_html}</ul>
-        </div>
-        """
-
-    html += "</body></html>"
-    return html
+    writer.close()
+
+
+# ---------------------------------------
+# HTML RENDERING
+# ---------------------------------------
+def render_html_report(report: Dict) -> str:
+    """
+    Returns HTML string of the report.
+    """
+    buf = io.StringIO()
+    write_html_report(report, buf)
+    return buf.getvalue()
 
 
 # -------------------------------------------------
 # SAVE HTML FILE WITH SAFE FILENAME
 # -------------------------------------------------
 def save_html_report(report: Dict, out_path: str):
-    safe_path = make_safe_filename(out_path)
+    safe_path = _safe_output_path(out_path)
 
-    html = render_html_report(report)
     with open(safe_path, "w", encoding="utf-8") as f:
-        f.write(html)
+        write_html_report(report, f)
 
     return safe_path
 
 
 # -------------------------------------------------
-# SAVE PDF REPORT (optional)
+# SAVE PDF REPORT (native, no wkhtmltopdf)
 # -------------------------------------------------
 def save_pdf_report(report: Dict, out_path: str):
+    # Imported here: pdf_report itself imports verdict_css from this module
     try:
-        import pdfkit
+        from src.pdf_report import write_pdf_report
     except ImportError:
-        raise RuntimeError(
-            "pdfkit is not installed. Run: pip install pdfkit + install wkhtmltopdf system binary."
-        )
-
-    safe_path = make_safe_filename(out_path)
+        from pdf_report import write_pdf_report
 
-    tmp_html = safe_path + ".tmp.html"
-    save_html_report(report, tmp_html)
+    safe_path = _safe_output_path(out_path)
 
-    # PDF export
-    pdfkit.from_file(tmp_html, safe_path)
-    os.remove(tmp_html)
+    with open(safe_path, "wb") as f:
+        write_pdf_report(report, f)
 
     return safe_path
@@ -2,18 +2,17 @@ import os
 import json
 import glob
 import subprocess
-import spacy
+
+try:
+    from src.caption_ingest import read_caption_text, caption_language, split_sentences
+except ImportError:
+    from caption_ingest import read_caption_text, caption_language, split_sentences
 
 CAPTION_DIR = "yt_captions"
 os.makedirs(CAPTION_DIR, exist_ok=True)
 
-# --- Load SpaCy NLP model ---
-try:
-    nlp = spacy.load("en_core_web_sm")
-except:
-    import spacy.cli
-    spacy.cli.download("en_core_web_sm")
-    nlp = spacy.load("en_core_web_sm")
+# Original-language auto captions first, English as fallback
+SUB_LANGS = ".*-orig,en"
 
 
 # --------------------------------------------
@@ -51,43 +50,25 @@ def extract_video_id(value: str):
 
 
 # -------------------------------------------------------
-# Load local JSON3 or text transcript & split into sentences
+# Load local caption (JSON3 / WebVTT / SRT) or text transcript
+# & split into sentences. Returns (language, sentences)
 # -------------------------------------------------------
 def load_local_transcript(path: str):
     try:
-        with open(path, "r", encoding="utf-8", errors="ignore") as f:
-            data = f.read()
-
-        # If it's JSON3
-        if path.endswith(".json3"):
-            try:
-                json_data = json.loads(data)
-                lines = []
-
-                for event in json_data.get("events", []):
-                    if "segs" in event:
-                        for seg in event["segs"]:
-                            t = seg.get("utf8", "").strip().replace("\n", " ")
-                            lines.append(t)
-
-                text = " ".join(lines)
-            except:
-                text = data  # fallback: treat as raw text
-
-        else:
-            text = data
+        text = read_caption_text(path)
 
         # Split into sentences
-        doc = nlp(text)
-        return [sent.text.strip() for sent in doc.sents]
+        lang = caption_language(path, text)
+        return lang, split_sentences(text, lang)
 
     except Exception as e:
         print("Error reading local transcript:", e)
-        return []
+        return None, []
 
 
 # -------------------------------------------------------
 # Download transcript with yt-dlp and extract sentences
+# Returns (language, sentences)
 # -------------------------------------------------------
 def load_youtube_transcript(video_id: str):
     url = f"https://www.youtube.com/watch?v={video_id}"
@@ -99,8 +80,9 @@ def load_youtube_transcript(video_id: str):
                 "yt-dlp",
                 "--skip-download",
                 "--write-auto-subs",
-                "--sub-lang", "en",
+                "--sub-langs", SUB_LANGS,
                 "--sub-format", "json3",
+                "--write-info-json",
                 "-o", output_template,
                 url
             ],
@@ -111,32 +93,50 @@ def load_youtube_transcript(video_id: str):
         caption_files = glob.glob(f"{CAPTION_DIR}/{video_id}*.json3")
         if not caption_files:
             print("❌ No subtitle file found.")
-            return []
-
-        with open(caption_files[0], "r", encoding="utf-8") as f:
-            data = json.load(f)
+            return None, []
 
-        lines = []
-        for event in data.get("events", []):
-            if "segs" in event:
-                for seg in event["segs"]:
-                    t = seg.get("utf8", "").strip().replace("\n", " ")
-                    lines.append(t)
+        # Prefer the original-language track over translations
+        caption_files.sort(key=lambda p: (not p.endswith("-orig.json3"), p))
+        caption_path = caption_files[0]
 
-        text = " ".join(lines)
+        text = read_caption_text(caption_path)
 
-        doc = nlp(text)
-        return [sent.text.strip() for sent in doc.sents]
+        lang = caption_language(caption_path, text)
+        return lang, split_sentences(text, lang)
 
     except Exception as e:
         print("❌ Unexpected error:", e)
-        return []
+        return None, []
+
+
+# -------------------------------------------------------
+# Channel name from the yt-dlp info JSON (if downloaded)
+# -------------------------------------------------------
+def get_video_channel(input_value: str):
+    mode, data = extract_video_id(input_value)
+    if mode != "youtube":
+        return None
+
+    info_path = os.path.join(CAPTION_DIR, f"{data}.info.json")
+    try:
+        with open(info_path, "r", encoding="utf-8") as f:
+            info = json.load(f)
+        return info.get("channel") or info.get("uploader")
+    except (OSError, ValueError):
+        return None
 
 
 # -------------------------------------------------------
 # MAIN ENTRY — Unified interface
 # -------------------------------------------------------
-def get_video_sentences(input_value: str):
+class TranscriptUnavailable(RuntimeError):
+    """No captions could be loaded for a video (or they were empty)."""
+
+
+def get_video_transcript(input_value: str):
+    """
+    Returns (language, sentences). Language is None if nothing was loaded.
+    """
     mode, data = extract_video_id(input_value)
 
     if mode == "local":
@@ -148,7 +148,11 @@ def get_video_sentences(input_value: str):
         return load_youtube_transcript(data)
 
     print("❌ Unsupported input format:", input_value)
-    return []
+    return None, []
+
+
+def get_video_sentences(input_value: str):
+    return get_video_transcript(input_value)[1]
 
 
 # Standalone test
@@ -157,8 +161,10 @@ if __name__ == "__main__":
     # 1. YouTube ID: "Ks-_Mh1QhMc"
     # 2. YouTube URL: "https://youtu.be/Ks-_Mh1QhMc"
     # 3. Local file: "yt_captions/Ks-_Mh1QhMc.en.json3"
+    # 4. Bundled sample: "samples/captions/sample_de.de-orig.json3"
     test_input = "Ks-_Mh1QhMc"
 
-    sentences = get_video_sentences(test_input)
+    lang, sentences = get_video_transcript(test_input)
+    print("Language:", lang)
     print("Extracted:", len(sentences))
     print("First 5:", sentences[:5])
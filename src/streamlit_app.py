@@ -42,7 +42,8 @@ if st.button("Check"):
                     for f in report["factual_claims_verified"]:
                         verdict = f["fact_check"].get("verdict", "UNVERIFIABLE")
                         color = "green" if verdict == "TRUE" else ("orange" if "PARTIAL" in verdict else "red")
-                        st.markdown(f"**Verdict:** `{verdict}` — **Score:** {f['model_score']}")
+                        model = f["fact_check"].get("model") or "none"
+                        st.markdown(f"**Verdict:** `{verdict}` ({model}) — **Score:** {f['model_score']}")
                         st.write(f["sentence"])
                         with st.expander("Explanation & Evidence"):
                             st.write(f["fact_check"].get("explanation",""))
@@ -52,7 +53,8 @@ if st.button("Check"):
                     st.subheader("Disputed claims (verified)")
                     for f in report["disputed_claims_verified"]:
                         verdict = f["fact_check"].get("verdict", "UNVERIFIABLE")
-                        st.markdown(f"**Verdict:** `{verdict}` — **Score:** {f['model_score']}")
+                        model = f["fact_check"].get("model") or "none"
+                        st.markdown(f"**Verdict:** `{verdict}` ({model}) — **Score:** {f['model_score']}")
                         st.write(f["sentence"])
                         with st.expander("Explanation & Evidence"):
                             st.write(f["fact_check"].get("explanation",""))
@@ -67,13 +69,13 @@ if st.button("Check"):
                     with open(html_path, "rb") as fh:
                         st.download_button("Download HTML Report", fh.read(), file_name=os.path.basename(html_path), mime="text/html")
 
-                    # offer PDF if pdfkit installed
+                    # PDF is generated in-process, no external binary needed
                     try:
                         pdf_path = os.path.join(tmp_dir, f"report_{report['video_id']}.pdf")
                         save_pdf_report(report, pdf_path)
                         with open(pdf_path, "rb") as fh:
                             st.download_button("Download PDF Report", fh.read(), file_name=os.path.basename(pdf_path), mime="application/pdf")
                     except Exception as e:
-                        st.info("PDF generation unavailable (needs wkhtmltopdf + pdfkit). You can still download HTML.")
+                        st.info(f"PDF generation failed ({e}). You can still download HTML.")
             except Exception as e:
                 st.error(f"Error calling API: {e}")
@@ -1,19 +1,43 @@
 # triage.py
 
-def classify_sentences(sentences, classifier):
+try:
+    from src.prefilter import prefilter_sentences
+    from src.languages import DEFAULT_LANGUAGE
+except ImportError:
+    from prefilter import prefilter_sentences
+    from languages import DEFAULT_LANGUAGE
+
+
+def classify_sentences(sentences, classifier, prefilter: bool = True,
+                       lang: str = DEFAULT_LANGUAGE):
     """
     Classifies sentences using string labels the classifier returns:
         'FACTUAL_CLAIM'
         'DISPUTED_CLAIM'
         'NOT_A_CLAIM'
+
+    With `prefilter` on, obvious non-claims (filler, greetings, short
+    fragments) are dropped before the transformer runs. They are counted
+    in both `ignored` and `prefiltered`. `lang` selects the pre-filter
+    rules (filler / opinion patterns are English only).
     """
 
     trusted = []
     disputed = []
-    ignored = 0
+    prefiltered = 0
+
+    if prefilter:
+        sentences, prefiltered = prefilter_sentences(sentences, lang)
+
+    ignored = prefiltered
+
+    # One batched call when the classifier supports it
+    if hasattr(classifier, "predict_batch"):
+        predictions = classifier.predict_batch(sentences)
+    else:
+        predictions = [classifier.predict(sent) for sent in sentences]
 
-    for sent in sentences:
-        label, score = classifier.predict(sent)
+    for sent, (label, score) in zip(sentences, predictions):
 
         # Case 1: Factual
         if label == "FACTUAL_CLAIM":
@@ -36,7 +60,8 @@ def classify_sentences(sentences, classifier):
     return {
         "trusted": trusted,
         "disputed": disputed,
-        "ignored": ignored
+        "ignored": ignored,
+        "prefiltered": prefiltered
     }
 
 
@@ -54,3 +79,4 @@ if __name__ == "__main__":
     print("Trusted:", len(results["trusted"]))
     print("Disputed:", len(results["disputed"]))
     print("Ignored:", results["ignored"])
+    print("Pre-filtered:", results["prefiltered"])